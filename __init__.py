@@ -1,34 +1,211 @@
 """D-Link Router integration for Home Assistant."""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Optional
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
 from .api import DLinkRouterAPI
 from .coordinator import DLinkRouterDataUpdateCoordinator
-from .const import DOMAIN, PLATFORMS, CONF_SSH_PORT, DEFAULT_PORT
+from .metrics import DLinkMetricsView
+from .services import async_setup_services
+from .timing import RollingStats
+from .transport import async_import_backend, backend_port
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    CONF_SSH_BACKEND,
+    CONF_COMMAND_MODE,
+    CONF_STREAM_INTERVAL,
+    CONF_HISTORY_PERSIST,
+    CONF_HTTP_PATH,
+    MIN_STREAM_INTERVAL,
+    HISTORY_SAVE_INTERVAL,
+    DEFAULT_SSH_BACKEND,
+    DEFAULT_COMMAND_MODE,
+    DEFAULT_HTTP_PATH,
+    DATA_FLEET,
+    MAX_CONCURRENT_SESSIONS,
+    FLEET_LATENCY_WINDOW,
+    LEGACY_UNIQUE_ID_PREFIX,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+class DLinkFleetManager:
+    """Все маршрутизаторы: общие соединения, фазы опроса и лимит одновременных сессий."""
+    
+    def __init__(self, hass: HomeAssistant):
+        """Инициализация."""
+        self.hass = hass
+        self._apis = {}
+        # Ключ пула -> ID записей, которые пользуются этим API-объектом
+        self._owners = {}
+        self._entries = []
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_SESSIONS)
+        self._latencies = RollingStats(FLEET_LATENCY_WINDOW)
+    
+    async def async_get_api(self, config: dict, entry_id: Optional[str] = None) -> DLinkRouterAPI:
+        """Получить общий API-объект для маршрутизатора из пула сессий.
+        
+        entry_id — запись, которая будет им пользоваться (config flow передаёт None).
+        """
+        host = config[CONF_HOST]
+        username = config[CONF_USERNAME]
+        password = config[CONF_PASSWORD]
+        backend = config.get(CONF_SSH_BACKEND, DEFAULT_SSH_BACKEND)
+        port = backend_port(backend, config)
+        command_mode = config.get(CONF_COMMAND_MODE, DEFAULT_COMMAND_MODE)
+        http_path = config.get(CONF_HTTP_PATH, DEFAULT_HTTP_PATH)
+        key = (host, port, username)
+        
+        api = self._apis.get(key)
+        if api is not None and (
+            api.password != password
+            or api.backend != backend
+            or api.command_mode != command_mode
+            or api.http_path != http_path
+        ):
+            # Сменились пароль или режим работы — старую сессию закрываем
+            await api.async_disconnect()
+            api = None
+        
+        if api is None:
+            # Модуль транспорта (для SSH — с cryptography) грузится в пуле потоков
+            await async_import_backend(backend)
+            api = DLinkRouterAPI(
+                host,
+                username,
+                password,
+                port,
+                backend=backend,
+                command_mode=command_mode,
+                http_path=http_path,
+            )
+            self._apis[key] = api
+        
+        if entry_id is not None:
+            self._owners.setdefault(key, set()).add(entry_id)
+        return api
+    
+    async def async_release_api(self, api: DLinkRouterAPI, entry_id: Optional[str] = None) -> None:
+        """Отпустить API-объект; сессия закрывается, когда им не пользуется ни одна запись."""
+        key = (api.host, api.port, api.username)
+        owners = self._owners.get(key, set())
+        owners.discard(entry_id)
+        if owners and self._apis.get(key) is api:
+            return
+        self._owners.pop(key, None)
+        if self._apis.get(key) is api:
+            self._apis.pop(key)
+        await api.async_disconnect()
+    
+    def register(self, entry_id: str) -> None:
+        """Добавить запись в расписание опроса."""
+        if entry_id not in self._entries:
+            self._entries.append(entry_id)
+    
+    def unregister(self, entry_id: str) -> None:
+        """Убрать запись из расписания опроса."""
+        if entry_id in self._entries:
+            self._entries.remove(entry_id)
+    
+    async def async_wait_phase(self, entry_id: str, tick: float) -> None:
+        """Дождаться своей фазы опроса, чтобы записи не опрашивались разом."""
+        if entry_id not in self._entries or len(self._entries) < 2:
+            return
+        
+        # Фазы равномерно разнесены по тику; опоздавшие не ждут следующего круга
+        phase = tick * self._entries.index(entry_id) / len(self._entries)
+        delay = (phase - self.hass.loop.time()) % tick
+        if delay <= tick / 2:
+            await asyncio.sleep(delay)
+    
+    @asynccontextmanager
+    async def async_session_slot(self):
+        """Ограничить число одновременно работающих сессий."""
+        async with self._semaphore:
+            yield
+    
+    def record_latency(self, seconds: float) -> None:
+        """Учесть длительность опроса."""
+        self._latencies.add(seconds)
+    
+    @property
+    def latency_stats(self) -> dict:
+        """Длительность опросов по всем маршрутизаторам."""
+        return self._latencies.summary()
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> DLinkFleetManager:
+    """Общий менеджер маршрутизаторов."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_FLEET not in domain_data:
+        domain_data[DATA_FLEET] = DLinkFleetManager(hass)
+    return domain_data[DATA_FLEET]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Регистрация сервисов и HTTP-экспорта метрик интеграции."""
+    async_setup_services(hass)
+    hass.http.register_view(DLinkMetricsView(hass))
+    return True
+
+
+@callback
+def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Перевести старые уникальные ID (dlink_router_*) на ID записи конфигурации."""
+    
+    @callback
+    def _migrate(entity_entry: er.RegistryEntry):
+        if entity_entry.unique_id.startswith(LEGACY_UNIQUE_ID_PREFIX):
+            suffix = entity_entry.unique_id[len(LEGACY_UNIQUE_ID_PREFIX):]
+            return {"new_unique_id": f"{entry.entry_id}_{suffix}"}
+        return None
+    
+    er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Установка интеграции из конфига."""
     
-    # Получаем параметры подключения
     host = entry.data[CONF_HOST]
-    username = entry.data[CONF_USERNAME]
-    password = entry.data[CONF_PASSWORD]
-    port = entry.data.get(CONF_SSH_PORT, DEFAULT_PORT)
+    fleet = async_get_fleet(hass)
     
-    # Создаём API объект
-    api = DLinkRouterAPI(host, username, password, port)
+    # Старые уникальные ID совпадали у разных маршрутизаторов
+    _async_migrate_unique_ids(hass, entry)
     
-    # Создаём координатор
-    coordinator = DLinkRouterDataUpdateCoordinator(hass, api)
+    # Берём API объект из пула (сессия могла остаться открытой после config flow)
+    api = await fleet.async_get_api(entry.data, entry.entry_id)
     
-    # Первое обновление данных
-    await coordinator.async_config_entry_first_refresh()
+    # Создаём координатор и ставим его в расписание опроса
+    coordinator = DLinkRouterDataUpdateCoordinator(hass, api, entry, fleet)
+    fleet.register(entry.entry_id)
+    
+    # История метрик переживает перезапуск, если это включено в опциях
+    if entry.options.get(CONF_HISTORY_PERSIST, False):
+        await coordinator.async_load_history()
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass, coordinator.async_save_history, timedelta(seconds=HISTORY_SAVE_INTERVAL)
+            )
+        )
+    
+    # Установка не ждёт маршрутизатор: сущности создаются из сохранённого снимка
+    # (или пустыми), первый опрос идёт в фоне. Интерфейсы, радио и трекеры, которых
+    # не было в снимке, платформы добавят по первому полному уведомлению
+    await coordinator.async_restore_snapshot()
     
     # Сохраняем в hass.data
     hass.data.setdefault(DOMAIN, {})
@@ -37,8 +214,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "api": api,
     }
     
-    # Загружаем платформы (sensor, switch и т.д.)
+    # Загружаем платформы (sensor, switch и т.д.); сеть они не трогают
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {host}"
+    )
+    
+    # Поток снимков с маршрутизатора вместо опроса (если включён в опциях)
+    stream_interval = entry.options.get(CONF_STREAM_INTERVAL, 0)
+    if stream_interval:
+        coordinator.async_start_stream(max(stream_interval, MIN_STREAM_INTERVAL))
+    
+    # Перезагружаемся при изменении опций (интервалы опроса)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     
     _LOGGER.info("D-Link Router интеграция загружена для %s", host)
     return True
@@ -51,9 +239,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        # Отключаемся от маршрутизатора
+        # Отключаемся от маршрутизатора и освобождаем сессию в пуле
         data = hass.data[DOMAIN].pop(entry.entry_id)
-        api = data["api"]
-        await hass.async_add_executor_job(api.disconnect)
+        await data["coordinator"].async_stop_stream()
+        await data["coordinator"].async_shutdown()
+        if entry.options.get(CONF_HISTORY_PERSIST, False):
+            await data["coordinator"].async_save_history()
+        await data["coordinator"].async_save_snapshot()
+        fleet = async_get_fleet(hass)
+        fleet.unregister(entry.entry_id)
+        await fleet.async_release_api(data["api"], entry.entry_id)
     
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Перезагрузка интеграции после изменения опций."""
+    await hass.config_entries.async_reload(entry.entry_id)
\ No newline at end of file
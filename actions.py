@@ -0,0 +1,104 @@
+"""On-demand refreshes and write commands for D-Link Router."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable, Optional, Set
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RefreshCoalescer:
+    """Запросы обновления за короткое окно сливаются в один опрос нужных групп."""
+    
+    def __init__(
+        self, refresh: Callable[[Optional[Set[str]]], Awaitable], window: float
+    ):
+        """Инициализация (refresh получает группы или None — все группы)."""
+        self._refresh = refresh
+        self.window = window
+        self._sections = set()
+        self._everything = False
+        self._future = None
+        self._task = None
+        self.requests = 0
+        self.refreshes = 0
+    
+    async def async_request(self, sections: Optional[Iterable[str]] = None):
+        """Запросить обновление групп (None — всех) и дождаться общего опроса."""
+        self.requests += 1
+        if sections is None:
+            self._everything = True
+        else:
+            self._sections.update(sections)
+        
+        # Первый запрос открывает окно; остальные присоединяются к нему
+        if self._future is None:
+            self._future = asyncio.get_running_loop().create_future()
+            # Ошибку получат ожидающие; если их отменили, она не должна попасть в лог asyncio
+            self._future.add_done_callback(
+                lambda future: future.cancelled() or future.exception()
+            )
+            self._task = asyncio.ensure_future(self._async_run(self._future))
+        # Отмена одного ожидающего не отменяет общий опрос
+        await asyncio.shield(self._future)
+    
+    async def _async_run(self, future: asyncio.Future):
+        """Дождаться конца окна и выполнить один опрос за всех."""
+        try:
+            await asyncio.sleep(self.window)
+            
+            # Запросы, пришедшие во время опроса, откроют следующее окно
+            sections = None if self._everything else self._sections
+            self._sections = set()
+            self._everything = False
+            self._future = None
+            self.refreshes += 1
+            await self._refresh(sections)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+        else:
+            future.set_result(None)
+    
+    def cancel(self):
+        """Отменить ожидающий опрос (запись выгружается)."""
+        if self._task is not None:
+            self._task.cancel()
+        # Задача могла ещё не начаться: ожидающих отпускаем сами
+        if self._future is not None:
+            self._future.cancel()
+        self._task = None
+        self._future = None
+
+
+class WriteQueue:
+    """Команды записи по очереди в общей сессии; затем перечитываются затронутые группы."""
+    
+    def __init__(self, coalescer: RefreshCoalescer):
+        """Инициализация."""
+        self._coalescer = coalescer
+        # asyncio.Lock отдаёт очередь в порядке ожидания: команды идут как пришли
+        self._lock = asyncio.Lock()
+        self.pending = 0
+    
+    async def async_submit(self, action: Callable[[], Awaitable], sections: Iterable[str] = ()):
+        """Выполнить действие в очереди и перечитать группы, которые оно меняет."""
+        self.pending += 1
+        try:
+            async with self._lock:
+                result = await action()
+        finally:
+            self.pending -= 1
+        
+        # Перечитывания соседних команд сливаются в один опрос
+        sections = set(sections)
+        if sections:
+            try:
+                await self._coalescer.async_request(sections)
+            except Exception as err:
+                _LOGGER.warning(
+                    "Не удалось перечитать %s после команды: %s", ", ".join(sorted(sections)), err
+                )
+        return result
\ No newline at end of file
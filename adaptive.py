@@ -0,0 +1,65 @@
+"""Adaptive polling interval for D-Link Router."""
+
+import random
+from typing import Optional
+
+from .const import (
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_STEP,
+    ADAPTIVE_IDLE_RATIO,
+)
+
+
+class AdaptiveInterval:
+    """Множитель интервала опроса: растёт при ошибках и нагрузке, спадает в простое.
+    
+    Настроенные интервалы групп — нижняя граница (множитель 1); верхняя —
+    ADAPTIVE_MAX_INTERVAL для тика опроса.
+    """
+    
+    def __init__(self, base: float, load_threshold: float = 0, latency_threshold: float = 0):
+        """Инициализация (base — тик опроса, секунды; порог 0 — не учитывать)."""
+        self.base = base
+        self.load_threshold = load_threshold
+        self.latency_threshold = latency_threshold
+        self.max_scale = max(ADAPTIVE_MAX_INTERVAL / base, 1.0)
+        self.failures = 0
+        
+        # Замедление из-за нагрузки и из-за ошибок учитываются отдельно:
+        # после первой удачи остаётся только первое
+        self._load_scale = 1.0
+        self._backoff = 1.0
+    
+    @property
+    def scale(self) -> float:
+        """Текущий множитель интервалов."""
+        return max(self._load_scale, self._backoff)
+    
+    @property
+    def interval(self) -> float:
+        """Текущий тик опроса, секунды."""
+        return self.base * self.scale
+    
+    def failure(self) -> float:
+        """Учесть неудачный опрос: экспоненциальная пауза с разбросом; вернуть тик."""
+        self.failures += 1
+        backoff = min(2 ** self.failures, self.max_scale)
+        self._backoff = min(backoff * random.uniform(0.8, 1.2), self.max_scale)
+        return self.interval
+    
+    def success(self, load: Optional[float], latency: float) -> float:
+        """Учесть удачный опрос с нагрузкой маршрутизатора и его длительностью; вернуть тик."""
+        self.failures = 0
+        self._backoff = 1.0
+        
+        measured = ((load, self.load_threshold), (latency, self.latency_threshold))
+        loads = [
+            (value, threshold)
+            for value, threshold in measured
+            if value is not None and threshold > 0
+        ]
+        if any(value > threshold for value, threshold in loads):
+            self._load_scale = min(self._load_scale * ADAPTIVE_STEP, self.max_scale)
+        elif all(value <= threshold * ADAPTIVE_IDLE_RATIO for value, threshold in loads):
+            self._load_scale = max(self._load_scale / ADAPTIVE_STEP, 1.0)
+        return self.interval
\ No newline at end of file
@@ -1,176 +1,531 @@
-"""API for D-Link Router via SSH."""
+"""API for D-Link Router via SSH, Telnet or HTTP JSON-RPC."""
 
+import copy
 import logging
-import paramiko
+import math
 import re
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from .const import (
+    SSH_TIMEOUT,
+    DEFAULT_SSH_BACKEND,
+    DEFAULT_COMMAND_MODE,
+    DEFAULT_HTTP_PATH,
+    COMMAND_MODE_SHELL,
+)
+from .breaker import STATE_HALF_OPEN, CircuitBreaker, CircuitOpenError
+from .parsers import ArpTable, InterfaceFilter, NetDevTable
+from .transport import CommandResult, async_tcp_probe, create_transport
 
 _LOGGER = logging.getLogger(__name__)
 
+# Секции опроса: имя -> команда на маршрутизаторе
+SECTION_COMMANDS = {
+    "loadavg": "cat /proc/loadavg",
+    "memory": "free -m",
+    "uptime": "cat /proc/uptime",
+    "interfaces": "cat /proc/net/dev",
+    "devices": "cat /proc/net/arp",
+    "cpu": "grep '^cpu' /proc/stat",
+    "conntrack": (
+        "cat /proc/sys/net/netfilter/nf_conntrack_count "
+        "/proc/sys/net/netfilter/nf_conntrack_max 2>/dev/null || "
+        "cat /proc/sys/net/ipv4/netfilter/ip_conntrack_count "
+        "/proc/sys/net/ipv4/netfilter/ip_conntrack_max"
+    ),
+    "wireless": (
+        "for d in /sys/class/net/*; do [ -e $d/phy80211 ] && "
+        "{ echo \"Interface ${d##*/}\"; iw dev ${d##*/} station dump; }; done 2>/dev/null"
+    ),
+    # Таблица соединений сжимается на маршрутизаторе до строк
+    # "src reply_src packets bytes reply_packets reply_bytes proto tuple..."
+    # (только соединения со счётчиками, nf_conntrack_acct=1)
+    "clients": (
+        "{ cat /proc/net/nf_conntrack || cat /proc/net/ip_conntrack; } 2>/dev/null | "
+        "awk '/bytes=/ { n = 0; key = ($1 == \"ipv4\" || $1 == \"ipv6\") ? $3 : $1; "
+        "for (i = 2; i <= NF; i++) { split($i, f, \"=\"); "
+        "if (f[1] == \"src\") src[++n] = f[2]; "
+        "else if (f[1] == \"packets\") packets[n] = f[2]; "
+        "else if (f[1] == \"bytes\") bytes[n] = f[2]; "
+        "else if (n == 1 && f[2] != \"\") key = key \" \" $i } "
+        "print src[1], src[2], packets[1], bytes[1], packets[2], bytes[2], key }'"
+    ),
+}
+
+# Значения секций, если их не удалось получить или разобрать
+SECTION_DEFAULTS = {
+    "loadavg": {'cpu_load_1': 0.0, 'cpu_load_5': 0.0, 'cpu_load_15': 0.0},
+    "memory": {
+        'memory_total': 0,
+        'memory_used': 0,
+        'memory_free': 0,
+        'memory_percentage': 0,
+    },
+    "uptime": {'uptime': "неизвестно", 'uptime_seconds': 0},
+    "interfaces": {'interfaces': {}},
+    "devices": {'connected_devices': [], 'connected_devices_count': 0},
+    "cpu": {'cpu_times': {}},
+    "conntrack": {
+        'conntrack_count': None,
+        'conntrack_max': None,
+        'conntrack_percentage': None,
+    },
+    "wireless": {'wireless': {}, 'wireless_stations': 0},
+    "clients": {'client_flows': {}},
+}
+
+# Маркер начала секции в выводе пакетной команды
+SECTION_MARKER = "@@dlink:"
+_SECTION_MARKER_BYTES = SECTION_MARKER.encode()
+
+# Маркер конца снимка в потоке с маршрутизатора
+STREAM_END_MARKER = "@@dlink-snap"
+
+
+def build_batch_command(commands: Dict[str, str]) -> str:
+    """Собрать одну составную команду с маркерами секций."""
+    return "; ".join(
+        f"echo '{SECTION_MARKER}{section}'; {command}"
+        for section, command in commands.items()
+    )
+
+
+def build_stream_command(interval: float, every: Dict[str, int]) -> str:
+    """Цикл на маршрутизаторе: снимок секций раз в interval секунд.
+    
+    every — секция -> раз в сколько снимков её выводить (1 — в каждом).
+    """
+    parts = []
+    for section, period in every.items():
+        body = f"echo '{SECTION_MARKER}{section}'; {SECTION_COMMANDS[section]}"
+        if period > 1:
+            body = f"[ $((i % {period})) -eq 0 ] && {{ {body}; }}"
+        parts.append(body)
+    # sleep без поддержки дробей сразу падает, и цикл крутился бы без паузы
+    pause = f"sleep {interval:g}"
+    if interval != int(interval):
+        pause = f"{{ {pause} 2>/dev/null || sleep {math.ceil(interval)}; }}"
+    return (
+        f"i=0; while :; do {'; '.join(parts)}; echo '{STREAM_END_MARKER}'; "
+        f"i=$((i + 1)); {pause}; done"
+    )
+
 
 class DLinkRouterAPI:
-    """Класс для работы с D-Link маршрутизатором через SSH."""
+    """Класс для работы с D-Link маршрутизатором (транспорт выбирается бэкендом)."""
     
-    def __init__(self, host: str, username: str, password: str, port: int = 22):
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        port: int = 22,
+        batched: bool = True,
+        backend: str = DEFAULT_SSH_BACKEND,
+        command_mode: str = DEFAULT_COMMAND_MODE,
+        http_path: str = DEFAULT_HTTP_PATH,
+    ):
         """Инициализация."""
         self.host = host
         self.username = username
         self.password = password
         self.port = port
-        self.ssh_client = None
+        self.batched = batched
+        self.backend = backend
+        self.command_mode = command_mode
+        self.http_path = http_path
         
-    def connect(self) -> bool:
-        """Подключиться по SSH."""
-        try:
-            self.ssh_client = paramiko.SSHClient()
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.ssh_client.connect(
-                self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                timeout=10,
-                look_for_keys=False,
-                allow_agent=False,
+        # Сессия общая для координатора, переключателей и config flow
+        self.transport = create_transport(
+            backend, host, port, username, password, command_mode, http_path
+        )
+        
+        # Замеры стадий (рукопожатия пишет транспорт)
+        self.timings = self.transport.timings
+        
+        # После серии ошибок обращения отклоняются сразу, без сети и таймаутов
+        self.breaker = CircuitBreaker()
+        
+        # Последний вывод и результат разбора каждой секции
+        self._parsed_cache = {}
+        self.parse_skipped = 0
+        
+        # Секции последнего разбора, получившие значения по умолчанию
+        self.failed_sections = set()
+        
+        # Записи интерфейсов и ARP живут между опросами и обновляются на месте
+        self._net_dev = NetDevTable()
+        self._arp = ArpTable()
+        self.interface_filter = None
+    
+    def set_interface_filter(self, interface_filter: Optional[InterfaceFilter]):
+        """Разбирать только подходящие интерфейсы (прошлые записи сбрасываются)."""
+        self.interface_filter = interface_filter
+        self._net_dev = NetDevTable(interface_filter)
+        self._parsed_cache.pop("interfaces", None)
+        self._parsed_cache.pop("wireless", None)
+    
+    @property
+    def handshakes(self) -> int:
+        """Сколько раз выполнялось SSH-рукопожатие."""
+        return self.transport.handshakes
+    
+    @property
+    def sessions_reused(self) -> int:
+        """Сколько раз переиспользовалась живая сессия."""
+        return self.transport.sessions_reused
+    
+    @property
+    def is_connected(self) -> bool:
+        """Жива ли сессия."""
+        return self.transport.is_connected
+    
+    def reset_backoff(self):
+        """Разрешить немедленное подключение."""
+        self.transport.reset_backoff()
+        self.breaker.reset()
+    
+    def _allow(self) -> bool:
+        """Спросить размыкатель; пробной попытке не мешает пауза транспорта."""
+        if not self.breaker.allow():
+            return False
+        if self.breaker.state == STATE_HALF_OPEN:
+            # Иначе пауза транспорта отклонила бы пробу без сети и удвоила паузу цепи
+            self.transport.reset_backoff()
+        return True
+    
+    def _check_breaker(self):
+        """CircuitOpenError, если цепь разомкнута."""
+        if not self._allow():
+            raise CircuitOpenError(
+                f"Маршрутизатор {self.host} недоступен, повтор через "
+                f"{self.breaker.retry_in or 0:.0f} с"
             )
-            _LOGGER.debug("SSH подключение установлено к %s", self.host)
-            return True
-        except Exception as err:
-            _LOGGER.error("Ошибка SSH подключения: %s", err)
+    
+    async def async_connect(self) -> bool:
+        """Подключиться (или переиспользовать живую сессию); разомкнутая цепь — сразу False."""
+        if not self._allow():
             return False
+        
+        # Перед полным рукопожатием — дешёвая проверка порта вместо таймаута входа
+        if not self.transport.is_connected:
+            if await async_tcp_probe(self.host, self.port) is None:
+                self.breaker.record_failure(f"порт {self.port} не отвечает")
+                return False
+        
+        if await self.transport.async_connect():
+            self.breaker.record_success()
+            return True
+        self.breaker.record_failure("не удалось подключиться")
+        return False
     
-    def disconnect(self):
+    async def async_disconnect(self):
         """Отключиться."""
-        if self.ssh_client:
-            try:
-                self.ssh_client.close()
-            except:
-                pass
+        await self.transport.async_close()
     
-    def execute_command(self, command: str) -> str:
+    async def async_execute_command(self, command: str) -> str:
         """Выполнить команду."""
-        if not self.ssh_client:
-            if not self.connect():
-                raise ConnectionError("Не удалось подключиться")
-        
+        self._check_breaker()
         try:
-            stdin, stdout, stderr = self.ssh_client.exec_command(command, timeout=10)
-            result = stdout.read().decode('utf-8', errors='ignore').strip()
-            error = stderr.read().decode('utf-8', errors='ignore').strip()
-            
-            if error and not result:
-                _LOGGER.warning("Команда '%s' вернула ошибку: %s", command, error)
-            
-            return result
+            output = await self.transport.async_run(command)
         except Exception as err:
-            _LOGGER.error("Ошибка выполнения команды '%s': %s", command, err)
+            self.breaker.record_failure(err)
             raise
+        self.breaker.record_success()
+        return output
     
-    def get_system_info(self) -> Dict:
-        """Получить всю информацию о системе."""
-        data = {}
+    async def async_execute_many(
+        self, commands: Iterable[Union[str, Tuple[str, float]]], timeout: float = SSH_TIMEOUT
+    ) -> AsyncIterator[CommandResult]:
+        """Выполнить команды и отдавать итоги по мере завершения (порядок — по index).
         
-        # CPU Load
-        try:
-            output = self.execute_command("cat /proc/loadavg")
-            values = output.split()
-            data['cpu_load_1'] = float(values[0])
-            data['cpu_load_5'] = float(values[1])
-            data['cpu_load_15'] = float(values[2])
-        except Exception as err:
-            _LOGGER.error("Ошибка получения CPU Load: %s", err)
-            data['cpu_load_1'] = 0.0
-            data['cpu_load_5'] = 0.0
-            data['cpu_load_15'] = 0.0
+        Команда — строка или пара (команда, таймаут); timeout — таймаут по умолчанию.
+        В режиме exec по SSH команды идут одновременно в каналах одной сессии.
+        """
+        jobs = [
+            (command, timeout) if isinstance(command, str) else tuple(command)
+            for command in commands
+        ]
+        self._check_breaker()
         
-        # Memory
+        # Ответ хотя бы одной команды — маршрутизатор жив; ошибка размыкателя — только
+        # если ни одна не ответила из-за соединения (долгая команда — не сбой маршрутизатора)
+        answered = False
+        error = None
+        results = self.transport.async_exec_many(jobs)
         try:
-            output = self.execute_command("free -m")
-            lines = output.split('\n')
-            mem_line = lines[1].split()
-            total = int(mem_line[1])
-            used = int(mem_line[2])
-            data['memory_total'] = total
-            data['memory_used'] = used
-            data['memory_free'] = int(mem_line[3])
-            data['memory_percentage'] = round((used / total) * 100, 1) if total > 0 else 0
-        except Exception as err:
-            _LOGGER.error("Ошибка получения Memory: %s", err)
-            data['memory_total'] = 0
-            data['memory_used'] = 0
-            data['memory_free'] = 0
-            data['memory_percentage'] = 0
+            async for result in results:
+                if result.exit_status is not None:
+                    answered = True
+                elif result.error != "timeout":
+                    error = result.error
+                yield result
+        finally:
+            # Итог нужен всегда, даже если итоги перестали читать: иначе пробная
+            # попытка разомкнутой цепи (half_open) так и останется занятой
+            await results.aclose()
+            if answered or error is None:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure(error)
+    
+    async def async_get_system_info(self, sections: Optional[Iterable[str]] = None) -> Dict:
+        """Получить информацию о системе (все секции или только указанные)."""
+        commands = {
+            section: command
+            for section, command in SECTION_COMMANDS.items()
+            if sections is None or section in sections
+        }
+        self._check_breaker()
         
-        # Uptime
-        try:
-            output = self.execute_command("cat /proc/uptime")
-            uptime_seconds = int(float(output.split()[0]))
-            days = uptime_seconds // 86400
-            hours = (uptime_seconds % 86400) // 3600
-            minutes = (uptime_seconds % 3600) // 60
-            data['uptime'] = f"{days}д {hours}ч {minutes}м"
-            data['uptime_seconds'] = uptime_seconds
-        except Exception as err:
-            _LOGGER.error("Ошибка получения Uptime: %s", err)
-            data['uptime'] = "неизвестно"
-            data['uptime_seconds'] = 0
+        if self.batched:
+            # Одна составная команда вместо отдельного канала на секцию
+            try:
+                with self.timings.measure("command"):
+                    output = await self.transport.async_run(
+                        build_batch_command(commands), raw=True
+                    )
+                outputs = self.split_sections(output)
+            except Exception as err:
+                _LOGGER.error("Ошибка пакетного опроса: %s", err)
+                self.breaker.record_failure(err)
+                outputs = {}
+        elif self.command_mode == COMMAND_MODE_SHELL:
+            # Все команды пишутся в оболочку разом, ответы читаются по маркерам
+            try:
+                with self.timings.measure("command"):
+                    results = await self.transport.async_run_pipelined(
+                        list(commands.values()), raw=True
+                    )
+                outputs = dict(zip(commands, results))
+            except Exception as err:
+                _LOGGER.error("Ошибка опроса через оболочку: %s", err)
+                self.breaker.record_failure(err)
+                outputs = {}
+        else:
+            outputs = {}
+            error = None
+            for section, command in commands.items():
+                try:
+                    with self.timings.measure(f"command:{section}"):
+                        outputs[section] = await self.transport.async_run(command, raw=True)
+                except Exception as err:
+                    _LOGGER.error("Ошибка выполнения секции %s: %s", section, err)
+                    error = err
+                    # Сессия оборвалась — остальные секции не ждут своих таймаутов
+                    if not self.transport.is_connected:
+                        break
+            # Ошибка размыкателя — только если не ответила ни одна секция
+            if commands and not outputs:
+                self.breaker.record_failure(error)
         
-        # Interface Traffic
-        try:
-            output = self.execute_command("cat /proc/net/dev")
-            interfaces = {}
-            lines = output.split('\n')[2:]  # Пропускаем заголовки
-            
-            for line in lines:
-                if not line.strip():
-                    continue
-                parts = line.split()
-                if len(parts) < 10:
-                    continue
-                    
-                iface_name = parts[0].replace(':', '')
-                interfaces[iface_name] = {
-                    'rx_bytes': int(parts[1]),
-                    'rx_packets': int(parts[2]),
-                    'tx_bytes': int(parts[9]),
-                    'tx_packets': int(parts[10]),
-                }
+        if outputs:
+            self.breaker.record_success()
+        with self.timings.measure("parse"):
+            return self.parse_sections(outputs, commands)
+    
+    @staticmethod
+    def split_sections(output: bytes) -> Dict[str, bytes]:
+        """Разделить вывод пакетной команды на секции по маркерам."""
+        # Режем буфер по позициям маркеров, без разбиения на строки
+        outputs = {}
+        pos = output.find(_SECTION_MARKER_BYTES)
+        while pos >= 0:
+            name_start = pos + len(_SECTION_MARKER_BYTES)
+            name_end = output.find(b'\n', name_start)
+            if name_end < 0:
+                name_end = len(output)
+            pos = output.find(_SECTION_MARKER_BYTES, name_end)
+            body_end = len(output) if pos < 0 else pos
+            section = output[name_start:name_end].strip().decode('ascii', errors='ignore')
+            outputs[section] = output[name_end + 1:body_end]
+        return outputs
+    
+    def parse_sections(
+        self, outputs: Dict[str, bytes], requested: Optional[Iterable[str]] = None
+    ) -> Dict:
+        """Разобрать вывод секций; при ошибке секция получает значения по умолчанию."""
+        data = {}
+        self.failed_sections = set()
+        parsers = {
+            "loadavg": self._parse_loadavg,
+            "memory": self._parse_memory,
+            "uptime": self._parse_uptime,
+            "interfaces": self._parse_interfaces,
+            "devices": self._parse_devices,
+            "cpu": self._parse_cpu,
+            "conntrack": self._parse_conntrack,
+            "wireless": self._parse_wireless,
+            "clients": self._parse_clients,
+        }
+        tables = {"interfaces": self._net_dev, "devices": self._arp}
+        for section, parser in parsers.items():
+            if section not in outputs:
+                continue
             
-            data['interfaces'] = interfaces
-        except Exception as err:
-            _LOGGER.error("Ошибка получения Interface Traffic: %s", err)
-            data['interfaces'] = {}
-        
-        # Connected Devices
-        try:
-            output = self.execute_command("cat /proc/net/arp")
-            devices = []
-            lines = output.split('\n')[1:]  # Пропускаем заголовок
+            # Вывод совпал байт в байт с прошлым — берём прошлый результат разбора
+            raw = outputs[section]
+            cached = self._parsed_cache.get(section)
+            if cached is not None and cached[0] == raw:
+                self.parse_skipped += 1
+                if section in tables:
+                    tables[section].settle()
+                data.update(cached[1])
+                continue
             
-            for line in lines:
-                if not line.strip():
-                    continue
-                parts = line.split()
-                if len(parts) >= 6 and parts[3] != "00:00:00:00:00:00":
-                    devices.append({
-                        'ip': parts[0],
-                        'mac': parts[3],
-                        'interface': parts[5],
-                    })
+            try:
+                with self.timings.measure(f"parse:{section}"):
+                    parsed = parser(raw)
+            except Exception as err:
+                _LOGGER.error("Ошибка разбора секции %s: %s", section, err)
+                self._parsed_cache.pop(section, None)
+                self.failed_sections.add(section)
+                data.update(copy.deepcopy(SECTION_DEFAULTS[section]))
+                continue
             
-            data['connected_devices'] = devices
-            data['connected_devices_count'] = len(devices)
-        except Exception as err:
-            _LOGGER.error("Ошибка получения Connected Devices: %s", err)
-            data['connected_devices'] = []
-            data['connected_devices_count'] = 0
+            self._parsed_cache[section] = (raw, parsed)
+            data.update(parsed)
         
+        # Запрошенные секции, которые не удалось получить вовсе
+        for section in parsers if requested is None else requested:
+            if section not in outputs:
+                self.failed_sections.add(section)
+                data.update(copy.deepcopy(SECTION_DEFAULTS[section]))
         return data
     
-    def reboot(self) -> bool:
+    @staticmethod
+    def _parse_loadavg(output: bytes) -> Dict:
+        """CPU Load из /proc/loadavg."""
+        values = output.split()
+        return {
+            'cpu_load_1': float(values[0]),
+            'cpu_load_5': float(values[1]),
+            'cpu_load_15': float(values[2]),
+        }
+    
+    @staticmethod
+    def _parse_memory(output: bytes) -> Dict:
+        """Память из free -m."""
+        lines = output.strip().splitlines()
+        mem_line = lines[1].split()
+        total = int(mem_line[1])
+        used = int(mem_line[2])
+        return {
+            'memory_total': total,
+            'memory_used': used,
+            'memory_free': int(mem_line[3]),
+            'memory_percentage': round((used / total) * 100, 1) if total > 0 else 0,
+        }
+    
+    @staticmethod
+    def _parse_uptime(output: bytes) -> Dict:
+        """Время работы из /proc/uptime."""
+        uptime_seconds = int(float(output.split()[0]))
+        days = uptime_seconds // 86400
+        hours = (uptime_seconds % 86400) // 3600
+        minutes = (uptime_seconds % 3600) // 60
+        return {
+            'uptime': f"{days}д {hours}ч {minutes}м",
+            'uptime_seconds': uptime_seconds,
+        }
+    
+    def _parse_interfaces(self, output: bytes) -> Dict:
+        """Все счётчики интерфейсов из /proc/net/dev."""
+        return {'interfaces': self._net_dev.parse(output)}
+    
+    def _parse_devices(self, output: bytes) -> Dict:
+        """Подключённые устройства из /proc/net/arp."""
+        devices = self._arp.parse(output)
+        return {
+            'connected_devices': devices,
+            'connected_devices_count': len(devices),
+        }
+    
+    @staticmethod
+    def _parse_cpu(output: bytes) -> Dict:
+        """Счётчики времени CPU из /proc/stat: (простой, всего) в тиках по строкам cpu*."""
+        # Загрузку в процентах считает координатор по приращениям между опросами
+        times = {}
+        for line in output.split(b'\n'):
+            values = line.split()
+            if len(values) < 6 or not values[0].startswith(b'cpu'):
+                continue
+            # guest уже учтён в user, поэтому всего — первые восемь полей; простой — idle + iowait
+            ticks = [int(value) for value in values[1:9]]
+            times[values[0].decode('ascii')] = (ticks[3] + ticks[4], sum(ticks))
+        return {'cpu_times': times}
+    
+    @staticmethod
+    def _parse_conntrack(output: bytes) -> Dict:
+        """Заполнение таблицы NAT: nf_conntrack_count и nf_conntrack_max."""
+        count, maximum = (int(value) for value in output.split()[:2])
+        return {
+            'conntrack_count': count,
+            'conntrack_max': maximum,
+            'conntrack_percentage': round(count / maximum * 100, 1) if maximum > 0 else 0,
+        }
+    
+    def _parse_wireless(self, output: bytes) -> Dict:
+        """Станции на каждом радиоинтерфейсе из iw station dump: число и уровень сигнала."""
+        radios = {}
+        signals = {}
+        radio = None
+        for line in output.split(b'\n'):
+            line = line.strip()
+            if line.startswith(b'Interface '):
+                name = line[10:].strip().decode('utf-8', errors='ignore')
+                if self.interface_filter is not None and not self.interface_filter(name):
+                    radio = None
+                    continue
+                radio = name
+                radios[radio] = 0
+                signals[radio] = []
+            elif radio is None:
+                continue
+            elif line.startswith(b'Station '):
+                radios[radio] += 1
+            elif line.startswith(b'signal:'):
+                signals[radio].append(int(line.split()[1]))
+        
+        wireless = {
+            radio: {
+                'stations': count,
+                'signal': round(sum(signals[radio]) / len(signals[radio]))
+                if signals[radio]
+                else None,
+                'signal_min': min(signals[radio]) if signals[radio] else None,
+            }
+            for radio, count in radios.items()
+        }
+        return {
+            'wireless': wireless,
+            'wireless_stations': sum(radios.values()),
+        }
+    
+    @staticmethod
+    def _parse_clients(output: bytes) -> Dict:
+        """Счётчики соединений conntrack: кортеж соединения -> адреса и счётчики.
+        
+        Адреса остаются байтами: клиента по ним находит координатор.
+        """
+        flows = {}
+        for line in output.split(b'\n'):
+            parts = line.split(b' ', 6)
+            if len(parts) < 7:
+                continue
+            flows[(parts[0], parts[6])] = (
+                parts[1],
+                int(parts[2]),
+                int(parts[3]),
+                int(parts[4]),
+                int(parts[5]),
+            )
+        return {'client_flows': flows}
+    
+    async def async_reboot(self) -> bool:
         """Перезагрузить маршрутизатор."""
         try:
-            self.execute_command("reboot")
+            await self.async_execute_command("reboot")
             _LOGGER.warning("Маршрутизатор перезагружается")
             return True
         except Exception as err:
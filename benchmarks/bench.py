@@ -0,0 +1,353 @@
+"""Offline benchmarks for the D-Link Router integration.
+
+Runs DLinkRouterAPI against benchmarks/fake_router.py and reports
+import time per module, connects/sec, polls/sec and execute_many
+commands/sec per backend and command mode, parse time per section and,
+when Home Assistant is installed, a full coordinator poll.
+    
+    python benchmarks/bench.py --latency 0.005 --arp 500 --interfaces 64
+"""
+
+import argparse
+import asyncio
+import importlib
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_router import FIXTURES, FakeRouter, _scaled_arp, _scaled_net_dev  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "dlink_router"
+
+# Модули, время импорта которых меряем (каждый — в чистом интерпретаторе)
+IMPORT_MODULES = (
+    "const",
+    "parsers",
+    "api",
+    "transport",
+    "ssh_paramiko",
+    "ssh_asyncssh",
+    "telnet",
+    "jsonrpc",
+)
+HEAVY_MODULES = ("paramiko", "asyncssh", "cryptography")
+
+# Пустой пакет вместо __init__.py: меряется только сам модуль и то, что он тянет;
+# asyncio и logging в Home Assistant уже загружены, их не считаем
+_IMPORT_SCRIPT = """
+import asyncio, importlib, json, logging, sys, time, types
+package = types.ModuleType({package!r})
+package.__path__ = [{root!r}]
+sys.modules[{package!r}] = package
+start = time.perf_counter()
+try:
+    importlib.import_module({module!r})
+except ImportError as err:
+    print(json.dumps([None, str(err)]))
+else:
+    elapsed = time.perf_counter() - start
+    print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def load_integration():
+    """Импортировать интеграцию как пакет dlink_router.
+    
+    С установленным Home Assistant загружается настоящий __init__.py;
+    без него — пустой пакет, чтобы работали api/transport и парсеры.
+    """
+    try:
+        spec = importlib.util.spec_from_file_location(
+            PACKAGE, ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[PACKAGE] = package
+        spec.loader.exec_module(package)
+        return package, True
+    except ImportError:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(ROOT)]
+        sys.modules[PACKAGE] = package
+        return package, False
+
+
+def section_outputs(arp_entries: int, interfaces: int) -> dict:
+    """Вывод секций (байты) так, как его вернёт маршрутизатор."""
+    net_dev = (FIXTURES / "net_dev").read_text()
+    arp = (FIXTURES / "arp").read_text()
+    outputs = {
+        "loadavg": (FIXTURES / "loadavg").read_text(),
+        "memory": (FIXTURES / "free").read_text(),
+        "uptime": (FIXTURES / "uptime").read_text(),
+        "interfaces": _scaled_net_dev(net_dev, interfaces) if interfaces else net_dev,
+        "devices": _scaled_arp(arp, arp_entries) if arp_entries else arp,
+        "cpu": (FIXTURES / "stat").read_text(),
+        "conntrack": (FIXTURES / "nf_conntrack_count").read_text()
+        + (FIXTURES / "nf_conntrack_max").read_text(),
+    }
+    return {section: output.encode() for section, output in outputs.items()}
+
+
+def bench_parse(api_module, outputs: dict, rounds: int) -> dict:
+    """Время разбора каждой секции (микросекунды), без кэша вывода.
+    
+    cold — первый разбор (записи интерфейсов и ARP создаются заново),
+    warm — повторный разбор теми же таблицами записей.
+    """
+    results = {}
+    for section, output in outputs.items():
+        cold = 0.0
+        for _ in range(rounds):
+            api = api_module.DLinkRouterAPI("127.0.0.1", "admin", "admin")
+            start = time.perf_counter()
+            api.parse_sections({section: output}, [section])
+            cold += time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds):
+            api._parsed_cache.clear()
+            api.parse_sections({section: output}, [section])
+        warm = time.perf_counter() - start
+        results[section] = {
+            "cold": round(cold / rounds * 1e6, 1),
+            "warm": round(warm / rounds * 1e6, 1),
+        }
+    return results
+
+
+def bench_imports(rounds: int) -> dict:
+    """Медиана времени импорта модулей (мс) и тяжёлые зависимости, которые он подтянул."""
+    results = {}
+    for module in IMPORT_MODULES:
+        seconds = []
+        heavy = []
+        for _ in range(rounds):
+            script = _IMPORT_SCRIPT.format(
+                package=PACKAGE, root=str(ROOT), module=f"{PACKAGE}.{module}", heavy=HEAVY_MODULES
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True, check=True
+            ).stdout
+            elapsed, heavy = json.loads(output)
+            if elapsed is None:
+                break
+            seconds.append(elapsed)
+        if not seconds:
+            results[module] = f"пропущено: {heavy}"
+            continue
+        results[module] = {
+            "ms": round(statistics.median(seconds) * 1000, 1),
+            "heavy": heavy,
+        }
+    return results
+
+
+async def bench_connects(api_module, router, backend: str, rounds: int) -> float:
+    """Полных подключений (TCP + SSH + пароль) в секунду."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        api = api_module.DLinkRouterAPI(
+            "127.0.0.1", router.username, router.password, router.port, backend=backend
+        )
+        if not await api.async_connect():
+            raise RuntimeError("Не удалось подключиться к тестовому маршрутизатору")
+        await api.async_disconnect()
+    return round(rounds / (time.perf_counter() - start), 2)
+
+
+async def bench_polls(api_module, router, backend, command_mode, batched, rounds) -> dict:
+    """Опросов get_system_info в секунду по постоянной сессии."""
+    api = api_module.DLinkRouterAPI(
+        "127.0.0.1",
+        router.username,
+        router.password,
+        router.port,
+        batched=batched,
+        backend=backend,
+        command_mode=command_mode,
+    )
+    await api.async_get_system_info()
+    commands_before = router.commands
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await api.async_get_system_info()
+    elapsed = time.perf_counter() - start
+    await api.async_disconnect()
+    return {
+        "polls_per_sec": round(rounds / elapsed, 2),
+        "commands_per_poll": round((router.commands - commands_before) / rounds, 2),
+        "timings": api.timings.summary(),
+    }
+
+
+async def bench_exec_many(api_module, router, backend, command_mode, rounds) -> float:
+    """Команд execute_many в секунду (по rounds команд за вызов)."""
+    api = api_module.DLinkRouterAPI(
+        "127.0.0.1",
+        router.username,
+        router.password,
+        router.port,
+        backend=backend,
+        command_mode=command_mode,
+    )
+    await api.async_connect()
+    start = time.perf_counter()
+    async for result in api.async_execute_many(["cat /proc/loadavg"] * rounds):
+        if not result.ok:
+            raise RuntimeError(f"Команда не выполнилась: {result.error}")
+    elapsed = time.perf_counter() - start
+    await _check_exec_streams(api)
+    await api.async_disconnect()
+    return round(rounds / elapsed, 2)
+
+
+async def _check_exec_streams(api) -> None:
+    """Команда, читающая stdin, не должна висеть; stderr и код выхода — доходить."""
+    results = {}
+    async for result in api.async_execute_many(["cat", "echo err >&2; exit 3"], timeout=5):
+        results[result.index] = result
+    reader, writer = results[0], results[1]
+    if not reader.ok or reader.elapsed > 2:
+        raise RuntimeError(f"Команда со stdin не завершилась: {reader.error}")
+    if writer.exit_status != 3 or writer.stderr.strip() != "err":
+        raise RuntimeError(f"stderr потерян: {writer.as_dict()}")
+
+
+async def bench_coordinator(package, router, rounds: int) -> dict:
+    """Полный цикл опроса координатора (нужен установленный Home Assistant)."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    import inspect
+    
+    coordinator_module = importlib.import_module(f"{PACKAGE}.coordinator")
+    const = importlib.import_module(f"{PACKAGE}.const")
+    
+    hass = HomeAssistant(str(router.root))
+    data = {
+        "host": "127.0.0.1",
+        "username": router.username,
+        "password": router.password,
+        const.CONF_SSH_PORT: router.port,
+    }
+    # Набор аргументов ConfigEntry меняется между версиями HA
+    candidates = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": const.DOMAIN,
+        "title": "bench",
+        "data": data,
+        "options": {},
+        "source": "user",
+        "unique_id": None,
+        "discovery_keys": {},
+        "subentries_data": None,
+    }
+    parameters = inspect.signature(ConfigEntry).parameters
+    entry = ConfigEntry(**{k: v for k, v in candidates.items() if k in parameters})
+    
+    fleet = package.async_get_fleet(hass)
+    api = await fleet.async_get_api(data)
+    coordinator = coordinator_module.DLinkRouterDataUpdateCoordinator(hass, api, entry, fleet)
+    await coordinator.async_refresh()
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        # Все группы считаются просроченными — худший случай тика
+        coordinator._last_fetch.clear()
+        await coordinator.async_refresh()
+    elapsed = time.perf_counter() - start
+    await fleet.async_release_api(api)
+    await hass.async_stop(force=True)
+    return {"polls_per_sec": round(rounds / elapsed, 2)}
+
+
+async def main(args) -> dict:
+    package, with_ha = load_integration()
+    api_module = importlib.import_module(f"{PACKAGE}.api")
+    const = importlib.import_module(f"{PACKAGE}.const")
+    
+    report = {
+        "params": vars(args),
+        "import_ms": bench_imports(args.import_rounds),
+        "parse_us": bench_parse(
+            api_module, section_outputs(args.arp, args.interfaces), args.parse_rounds
+        ),
+    }
+    
+    router = FakeRouter(args.latency, args.arp, args.interfaces)
+    router.start()
+    try:
+        report["connects_per_sec"] = {
+            backend: await bench_connects(api_module, router, backend, args.connects)
+            for backend in const.SSH_BACKENDS
+        }
+        report["polls"] = {}
+        for backend in const.SSH_BACKENDS:
+            for command_mode in const.COMMAND_MODES:
+                for batched in (True, False):
+                    name = f"{backend}/{command_mode}/{'batched' if batched else 'split'}"
+                    report["polls"][name] = await bench_polls(
+                        api_module, router, backend, command_mode, batched, args.polls
+                    )
+        report["exec_many_per_sec"] = {
+            f"{backend}/{command_mode}": await bench_exec_many(
+                api_module, router, backend, command_mode, args.polls
+            )
+            for backend in const.SSH_BACKENDS
+            for command_mode in const.COMMAND_MODES
+        }
+        if with_ha:
+            report["coordinator"] = await bench_coordinator(package, router, args.polls)
+        else:
+            report["coordinator"] = "пропущено: Home Assistant не установлен"
+    finally:
+        router.stop()
+    return report
+
+
+def print_report(report: dict):
+    print("Импорт модулей, мс (медиана, тяжёлые зависимости):")
+    for module, value in report["import_ms"].items():
+        if isinstance(value, str):
+            print(f"  {module:<12} {value}")
+            continue
+        print(f"  {module:<12} {value['ms']:>10}  {', '.join(value['heavy']) or '-'}")
+    print("Разбор секций, мкс (первый / повторный):")
+    for section, value in report["parse_us"].items():
+        print(f"  {section:<12} {value['cold']:>10} {value['warm']:>10}")
+    print("Подключений в секунду:")
+    for backend, value in report["connects_per_sec"].items():
+        print(f"  {backend:<12} {value:>10}")
+    print("Опросов в секунду (команд на опрос):")
+    for name, value in report["polls"].items():
+        print(f"  {name:<28} {value['polls_per_sec']:>8} ({value['commands_per_poll']})")
+    print("Команд execute_many в секунду:")
+    for name, value in report["exec_many_per_sec"].items():
+        print(f"  {name:<28} {value:>8}")
+    print("Координатор:", report["coordinator"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка на команду, с")
+    parser.add_argument("--arp", type=int, default=0, help="записей ARP (0 — фикстура)")
+    parser.add_argument("--interfaces", type=int, default=0, help="интерфейсов (0 — фикстура)")
+    parser.add_argument("--connects", type=int, default=10)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--parse-rounds", type=int, default=2000)
+    parser.add_argument("--import-rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="вывести отчёт в JSON")
+    args = parser.parse_args()
+    
+    result = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""Fake D-Link router: a local SSH server that replays recorded /proc outputs.
+
+Commands are run by a real /bin/sh against a temporary directory that
+mirrors the router's /proc and /sys, so batched commands, section markers
+and the interactive shell mode behave exactly as on the device.
+"""
+
+import logging
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import paramiko
+
+# Обрывы соединений при остановке клиентов ожидаемы, трассировки paramiko не нужны
+logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Файл фикстуры -> путь на "маршрутизаторе"
+FIXTURE_PATHS = {
+    "loadavg": "proc/loadavg",
+    "uptime": "proc/uptime",
+    "net_dev": "proc/net/dev",
+    "arp": "proc/net/arp",
+    "free": "free",
+    "stat": "proc/stat",
+    "nf_conntrack_count": "proc/sys/net/netfilter/nf_conntrack_count",
+    "nf_conntrack_max": "proc/sys/net/netfilter/nf_conntrack_max",
+    "nf_conntrack": "proc/net/nf_conntrack",
+}
+
+
+def _scaled_net_dev(base: str, interfaces: int) -> str:
+    """Добавить синтетические интерфейсы до нужного количества."""
+    lines = base.rstrip("\n").split("\n")
+    rng = random.Random(interfaces)
+    for index in range(max(0, interfaces - (len(lines) - 2))):
+        rx, tx = rng.randrange(2 ** 32), rng.randrange(2 ** 32)
+        lines.append(
+            f"{'vlan' + str(index):>6}:{rx:>8} {rx // 700:>7}    0    0    0     0"
+            f"          0         0 {tx:>8} {tx // 700:>7}    0    0    0     0       0          0"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _scaled_arp(base: str, entries: int) -> str:
+    """Добавить синтетических клиентов до нужного количества."""
+    lines = base.rstrip("\n").split("\n")
+    rng = random.Random(entries)
+    for index in range(max(0, entries - (len(lines) - 1))):
+        mac = ":".join(f"{rng.randrange(256):02x}" for _ in range(6))
+        ip = f"192.168.{1 + index // 250}.{2 + index % 250}"
+        lines.append(f"{ip:<16} 0x1         0x2         {mac}     *        br0")
+    return "\n".join(lines) + "\n"
+
+
+class _Server(paramiko.ServerInterface):
+    """Принимает любой пароль и запоминает запросы exec/shell по каналам."""
+    
+    def __init__(self, router):
+        self.router = router
+        self.requests = {}
+    
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED_OPEN_REQUEST
+    
+    def check_auth_password(self, username, password):
+        if (username, password) == (self.router.username, self.router.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+    
+    def get_allowed_auths(self, username):
+        return "password"
+    
+    def check_channel_pty_request(self, channel, *args):
+        return True
+    
+    def check_channel_exec_request(self, channel, command):
+        self._request(channel, ("exec", command.decode("utf-8", errors="ignore")))
+        return True
+    
+    def check_channel_shell_request(self, channel):
+        self._request(channel, ("shell", None))
+        return True
+    
+    def _request(self, channel, request):
+        event = self.requests.setdefault(channel.get_id(), [threading.Event(), None])
+        event[1] = request
+        event[0].set()
+
+
+class FakeRouter:
+    """Локальный SSH-сервер с фикстурами /proc, задержкой и масштабом."""
+    
+    def __init__(
+        self,
+        latency: float = 0.0,
+        arp_entries: int = 0,
+        interfaces: int = 0,
+        username: str = "admin",
+        password: str = "admin",
+    ):
+        """Инициализация (latency — задержка ответа на каждую команду, секунды)."""
+        self.latency = latency
+        self.username = username
+        self.password = password
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.root = Path(tempfile.mkdtemp(prefix="dlink-fake-"))
+        self.port = None
+        self.commands = 0
+        self._socket = None
+        self._running = False
+        self._render(arp_entries, interfaces)
+    
+    def _render(self, arp_entries: int, interfaces: int):
+        """Разложить фикстуры по временному каталогу."""
+        for name, path in FIXTURE_PATHS.items():
+            content = (FIXTURES / name).read_text()
+            if name == "arp" and arp_entries:
+                content = _scaled_arp(content, arp_entries)
+            if name == "net_dev" and interfaces:
+                content = _scaled_net_dev(content, interfaces)
+            target = self.root / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content)
+    
+    def rewrite(self, command: str) -> str:
+        """Перенаправить пути маршрутизатора в каталог фикстур."""
+        # Один проход: уже переписанный путь не должен попасть под замену снова
+        command = re.sub(r"(?<![\w.-])/(proc|sys)/", rf"{self.root}/\1/", command)
+        return command.replace("free -m", f"cat {self.root}/free")
+    
+    def start(self) -> int:
+        """Запустить сервер на 127.0.0.1; вернуть порт."""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(100)
+        self.port = self._socket.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.port
+    
+    def stop(self):
+        """Остановить сервер и удалить фикстуры."""
+        self._running = False
+        if self._socket is not None:
+            self._socket.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+    
+    def _serve(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        server = _Server(self)
+        try:
+            transport.start_server(server=server)
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+        while transport.is_active():
+            channel = transport.accept(1)
+            if channel is None:
+                continue
+            threading.Thread(
+                target=self._serve_channel, args=(server, channel), daemon=True
+            ).start()
+    
+    def _serve_channel(self, server, channel):
+        event = server.requests.setdefault(channel.get_id(), [threading.Event(), None])
+        if not event[0].wait(10):
+            channel.close()
+            return
+        kind, command = event[1]
+        if kind == "exec":
+            self._exec(channel, command)
+        else:
+            self._shell(channel)
+    
+    def _exec(self, channel, command):
+        """Одна команда через sh -c; stdin и stderr идут через канал, вывод — по мере появления."""
+        self.commands += 1
+        if self.latency:
+            time.sleep(self.latency)
+        process = subprocess.Popen(
+            ["sh", "-c", self.rewrite(command)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        
+        def pump_stdin():
+            # EOF канала (shutdown_write клиента) закрывает stdin процесса
+            try:
+                for data in iter(lambda: channel.recv(65536), b""):
+                    process.stdin.write(data)
+                    process.stdin.flush()
+            except (EOFError, OSError):
+                pass
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        
+        def pump_stderr():
+            for chunk in iter(lambda: os.read(process.stderr.fileno(), 65536), b""):
+                try:
+                    channel.sendall_stderr(chunk)
+                except (EOFError, OSError):
+                    break
+        
+        threading.Thread(target=pump_stdin, daemon=True).start()
+        errors = threading.Thread(target=pump_stderr, daemon=True)
+        errors.start()
+        try:
+            for chunk in iter(lambda: os.read(process.stdout.fileno(), 65536), b""):
+                channel.sendall(chunk)
+            errors.join()
+            channel.send_exit_status(process.wait())
+        except (EOFError, OSError):
+            pass
+        finally:
+            process.kill()
+            process.wait()
+            try:
+                channel.close()
+            except (EOFError, OSError):
+                pass
+    
+    def _shell(self, channel):
+        """Интерактивная оболочка: строки stdin переписываются и уходят в sh."""
+        process = subprocess.Popen(
+            ["sh"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        
+        def pump_output():
+            for chunk in iter(lambda: os.read(process.stdout.fileno(), 65536), b""):
+                try:
+                    channel.sendall(chunk)
+                except (EOFError, OSError):
+                    break
+            try:
+                channel.close()
+            except (EOFError, OSError):
+                pass
+        
+        threading.Thread(target=pump_output, daemon=True).start()
+        buffer = b""
+        try:
+            while True:
+                data = channel.recv(65536)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    text = line.decode("utf-8", errors="ignore")
+                    if text.strip() and not text.startswith("__rc="):
+                        self.commands += 1
+                        if self.latency:
+                            time.sleep(self.latency)
+                    process.stdin.write(self.rewrite(text).encode() + b"\n")
+                process.stdin.flush()
+        except (EOFError, OSError):
+            pass
+        finally:
+            process.kill()
\ No newline at end of file
@@ -6,9 +6,9 @@ from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .entity import DLinkEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,17 +25,21 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(sensors)
 
 
-class DLinkConnectivitySensor(CoordinatorEntity, BinarySensorEntity):
+class DLinkConnectivitySensor(DLinkEntity, BinarySensorEntity):
     """Сенсор подключения к маршрутизатору."""
     
     def __init__(self, coordinator):
         """Инициализация."""
-        super().__init__(coordinator)
-        self._attr_name = "D-Link Router Connection"
-        self._attr_unique_id = "dlink_router_connection"
+        super().__init__(coordinator, "connection")
+        self._attr_name = "Connection"
         self._attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
     
     @property
     def is_on(self):
         """Подключён ли маршрутизатор."""
-        return self.coordinator.last_update_success
\ No newline at end of file
+        return self.coordinator.last_update_success
+    
+    @property
+    def extra_state_attributes(self):
+        """Состояние размыкателя цепи: closed, open или half_open, ошибки и пауза."""
+        return self.coordinator.api.breaker.as_dict()
\ No newline at end of file
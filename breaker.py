@@ -0,0 +1,105 @@
+"""Circuit breaker for D-Link Router."""
+
+import time
+from typing import Dict, Optional
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT_MAX,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Цепь разомкнута: обращение отклонено без подключения к маршрутизатору."""
+
+
+class CircuitBreaker:
+    """Размыкатель: после серии ошибок обращения к маршрутизатору сразу отклоняются.
+    
+    closed — обращения идут; open — отклоняются без сети до конца паузы;
+    half_open — пропускается одна пробная попытка, её итог замыкает или снова
+    размыкает цепь (пауза удваивается до BREAKER_RESET_TIMEOUT_MAX).
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        """Инициализация (reset_timeout — первая пауза разомкнутой цепи, секунды)."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self.last_error = None
+        self._timeout = reset_timeout
+        self._opened_at = 0.0
+        self._trial = False
+    
+    @property
+    def retry_in(self) -> Optional[float]:
+        """Секунд до пробной попытки (None — цепь не разомкнута)."""
+        if self.state != STATE_OPEN:
+            return None
+        return max(self._opened_at + self._timeout - time.monotonic(), 0.0)
+    
+    def allow(self) -> bool:
+        """Можно ли обращаться к маршрутизатору сейчас."""
+        if self.state == STATE_OPEN and not self.retry_in:
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN:
+            # Пока идёт пробная попытка, остальные отклоняются
+            if self._trial:
+                self.rejected += 1
+                return False
+            self._trial = True
+            return True
+        if self.state == STATE_OPEN:
+            self.rejected += 1
+            return False
+        return True
+    
+    def record_success(self):
+        """Учесть удачное обращение: цепь замыкается."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._timeout = self.reset_timeout
+        self._trial = False
+    
+    def record_failure(self, err=None):
+        """Учесть ошибку: на пороге (или в пробной попытке) цепь размыкается."""
+        self.failures += 1
+        self.last_error = str(err) if err is not None else None
+        if self.state == STATE_HALF_OPEN:
+            self._timeout = min(self._timeout * 2, BREAKER_RESET_TIMEOUT_MAX)
+        elif self.state == STATE_CLOSED and self.failures < self.failure_threshold:
+            return
+        if self.state != STATE_OPEN:
+            self.trips += 1
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._trial = False
+    
+    def reset(self):
+        """Замкнуть цепь (например, перед проверкой в config flow)."""
+        self.record_success()
+        self.last_error = None
+    
+    def as_dict(self) -> Dict:
+        """Состояние для атрибутов сущности и диагностики."""
+        retry_in = self.retry_in
+        return {
+            "circuit": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "rejected_calls": self.rejected,
+            "retry_in": round(retry_in, 1) if retry_in is not None else None,
+            "last_error": self.last_error,
+        }
\ No newline at end of file
@@ -1,18 +1,70 @@
 """Config flow for D-Link Router."""
 
+import logging
+import re
+
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD
 from homeassistant.core import callback
 
-from .api import DLinkRouterAPI
-from .const import DOMAIN, DEFAULT_HOST, DEFAULT_USERNAME, DEFAULT_PORT, CONF_SSH_PORT
+from . import async_get_fleet
+from .const import (
+    DOMAIN,
+    DEFAULT_HOST,
+    DEFAULT_USERNAME,
+    DEFAULT_PORT,
+    DEFAULT_SSH_BACKEND,
+    DEFAULT_COMMAND_MODE,
+    CONF_SSH_PORT,
+    CONF_SSH_BACKEND,
+    CONF_COMMAND_MODE,
+    CONF_TELNET_PORT,
+    CONF_HTTP_PORT,
+    CONF_HTTP_PATH,
+    DEFAULT_TELNET_PORT,
+    DEFAULT_HTTP_PORT,
+    DEFAULT_HTTP_PATH,
+    BACKENDS,
+    BACKEND_AUTO,
+    COMMAND_MODES,
+    SECTION_INTERVALS,
+    MIN_SCAN_INTERVAL,
+    CONF_INTERVAL_PREFIX,
+    CONF_RATE_SMOOTHING,
+    CONF_STREAM_INTERVAL,
+    CONF_ENTITY_RESOLUTION,
+    CONF_HISTORY_PERSIST,
+    CONF_INTERFACE_INCLUDE,
+    CONF_INTERFACE_EXCLUDE,
+    CONF_LOAD_THRESHOLD,
+    CONF_LATENCY_THRESHOLD,
+    CONF_CLIENT_TOP_N,
+    DEFAULT_INTERFACE_INCLUDE,
+    DEFAULT_INTERFACE_EXCLUDE,
+    DEFAULT_LOAD_THRESHOLD,
+    DEFAULT_LATENCY_THRESHOLD,
+    DEFAULT_CLIENT_TOP_N,
+    RESOLUTIONS,
+    DEFAULT_ENTITY_RESOLUTION,
+)
+from .parsers import InterfaceFilter, parse_patterns
+from .transport import async_probe_transports, fastest_backend
+
+_LOGGER = logging.getLogger(__name__)
 
 DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_HOST, default=DEFAULT_HOST): str,
     vol.Required(CONF_USERNAME, default=DEFAULT_USERNAME): str,
     vol.Required(CONF_PASSWORD): str,
     vol.Optional(CONF_SSH_PORT, default=DEFAULT_PORT): int,
+    vol.Optional(CONF_SSH_BACKEND, default=DEFAULT_SSH_BACKEND): vol.In(
+        [BACKEND_AUTO] + BACKENDS
+    ),
+    vol.Optional(CONF_COMMAND_MODE, default=DEFAULT_COMMAND_MODE): vol.In(COMMAND_MODES),
+    vol.Optional(CONF_TELNET_PORT, default=DEFAULT_TELNET_PORT): int,
+    vol.Optional(CONF_HTTP_PORT, default=DEFAULT_HTTP_PORT): int,
+    vol.Optional(CONF_HTTP_PATH, default=DEFAULT_HTTP_PATH): str,
 })
 
 
@@ -21,6 +73,12 @@ class DLinkRouterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     
     VERSION = 1
     
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Поток опций."""
+        return DLinkRouterOptionsFlow(config_entry)
+    
     async def async_step_user(self, user_input=None):
         """Шаг 1: Ввод данных пользователем."""
         
@@ -29,26 +87,45 @@ class DLinkRouterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             # Тестируем подключение
             host = user_input[CONF_HOST]
-            username = user_input[CONF_USERNAME]
-            password = user_input[CONF_PASSWORD]
-            port = user_input.get(CONF_SSH_PORT, DEFAULT_PORT)
+            
+            # Одна запись на маршрутизатор: две записи делили бы API-объект из пула
+            await self.async_set_unique_id(host.lower())
+            self._abort_if_unique_id_configured()
             
             try:
-                # Проверяем подключение
-                api = DLinkRouterAPI(host, username, password, port)
-                connected = await self.hass.async_add_executor_job(api.connect)
+                # auto: пробуем SSH-бэкенды и запоминаем самый быстрый из ответивших
+                backend = user_input[CONF_SSH_BACKEND]
+                if backend == BACKEND_AUTO:
+                    results = await async_probe_transports(
+                        host,
+                        user_input[CONF_USERNAME],
+                        user_input[CONF_PASSWORD],
+                        user_input,
+                        user_input[CONF_HTTP_PATH],
+                    )
+                    backend = fastest_backend(results)
+                    _LOGGER.info("Транспорты %s: %s, выбран %s", host, results, backend)
+                    user_input = {**user_input, CONF_SSH_BACKEND: backend}
                 
-                if not connected:
+                if backend is None:
+                    # Ни один транспорт не ответил
                     errors["base"] = "cannot_connect"
                 else:
-                    # Отключаемся
-                    await self.hass.async_add_executor_job(api.disconnect)
+                    # Проверяем подключение; сессия остаётся в пуле для async_setup_entry
+                    fleet = async_get_fleet(self.hass)
+                    api = await fleet.async_get_api(user_input)
+                    api.reset_backoff()
+                    connected = await api.async_connect()
                     
-                    # Создаём entry
-                    return self.async_create_entry(
-                        title=f"D-Link Router ({host})",
-                        data=user_input,
-                    )
+                    if not connected:
+                        await fleet.async_release_api(api)
+                        errors["base"] = "cannot_connect"
+                    else:
+                        # Создаём entry
+                        return self.async_create_entry(
+                            title=f"D-Link Router ({host})",
+                            data=user_input,
+                        )
                     
             except Exception:
                 errors["base"] = "unknown"
@@ -58,4 +135,72 @@ class DLinkRouterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user",
             data_schema=DATA_SCHEMA,
             errors=errors,
+        )
+
+
+class DLinkRouterOptionsFlow(config_entries.OptionsFlow):
+    """Опции D-Link Router: опрос, сглаживание, поток, история и интерфейсы."""
+    
+    def __init__(self, config_entry):
+        """Инициализация."""
+        self._entry = config_entry
+    
+    async def async_step_init(self, user_input=None):
+        """Интервалы опроса."""
+        errors = {}
+        
+        if user_input is not None:
+            # Шаблоны /regex/ проверяем сразу, чтобы запись не упала при загрузке
+            try:
+                InterfaceFilter(
+                    parse_patterns(user_input.get(CONF_INTERFACE_INCLUDE, "")),
+                    parse_patterns(user_input.get(CONF_INTERFACE_EXCLUDE, "")),
+                )
+            except re.error:
+                errors["base"] = "invalid_pattern"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+        
+        options = self._entry.options
+        schema = {}
+        for section, default in SECTION_INTERVALS.items():
+            key = f"{CONF_INTERVAL_PREFIX}{section}"
+            schema[vol.Optional(key, default=options.get(key, default))] = vol.All(
+                vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)
+            )
+        schema[
+            vol.Optional(CONF_RATE_SMOOTHING, default=options.get(CONF_RATE_SMOOTHING, 0))
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Optional(CONF_STREAM_INTERVAL, default=options.get(CONF_STREAM_INTERVAL, 0))
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        for key, default in (
+            (CONF_LOAD_THRESHOLD, DEFAULT_LOAD_THRESHOLD),
+            (CONF_LATENCY_THRESHOLD, DEFAULT_LATENCY_THRESHOLD),
+        ):
+            schema[vol.Optional(key, default=options.get(key, default))] = vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            )
+        schema[
+            vol.Optional(
+                CONF_CLIENT_TOP_N, default=options.get(CONF_CLIENT_TOP_N, DEFAULT_CLIENT_TOP_N)
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Optional(
+                CONF_ENTITY_RESOLUTION,
+                default=options.get(CONF_ENTITY_RESOLUTION, DEFAULT_ENTITY_RESOLUTION),
+            )
+        ] = vol.In(RESOLUTIONS)
+        schema[
+            vol.Optional(CONF_HISTORY_PERSIST, default=options.get(CONF_HISTORY_PERSIST, False))
+        ] = bool
+        for key, default in (
+            (CONF_INTERFACE_INCLUDE, DEFAULT_INTERFACE_INCLUDE),
+            (CONF_INTERFACE_EXCLUDE, DEFAULT_INTERFACE_EXCLUDE),
+        ):
+            schema[vol.Optional(key, default=options.get(key, default))] = str
+        
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(schema), errors=errors
         )
\ No newline at end of file
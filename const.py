@@ -10,9 +10,146 @@ DEFAULT_HOST = "192.168.1.100"
 DEFAULT_PORT = 22
 DEFAULT_USERNAME = "admin"
 DEFAULT_SCAN_INTERVAL = 30  # секунды (обновление каждые 30 секунд)
+MIN_SCAN_INTERVAL = 5  # секунды (самый частый допустимый опрос группы)
+
+# Интервалы опроса групп метрик по умолчанию (секунды): группа -> интервал
+SECTION_INTERVALS = {
+    "loadavg": DEFAULT_SCAN_INTERVAL,
+    "memory": 300,
+    "uptime": 60,
+    "interfaces": 5,
+    "devices": 10,
+    "cpu": 10,
+    "conntrack": 30,
+    "wireless": 30,
+    "clients": 30,
+}
+
+# Интерфейсы без сенсоров по умолчанию: петля и служебные очереди шейпера
+DEFAULT_INTERFACE_INCLUDE = ""
+DEFAULT_INTERFACE_EXCLUDE = "lo, ifb*, imq*"
 
 # Платформы (типы устройств)
-PLATFORMS = ["sensor", "switch", "binary_sensor"]
+PLATFORMS = ["sensor", "switch", "binary_sensor", "device_tracker"]
+
+# События подключения и отключения устройств (по снимкам ARP)
+EVENT_DEVICE_JOINED = "dlink_router_device_joined"
+EVENT_DEVICE_LEFT = "dlink_router_device_left"
+
+# Событие с итогом каждой команды сервиса run_command (сразу по завершении)
+EVENT_COMMAND_RESULT = "dlink_router_command_result"
 
 # Конфигурационные ключи
-CONF_SSH_PORT = "ssh_port"
\ No newline at end of file
+CONF_SSH_PORT = "ssh_port"
+CONF_SSH_BACKEND = "ssh_backend"
+CONF_COMMAND_MODE = "command_mode"
+CONF_INTERVAL_PREFIX = "interval_"  # опции: interval_<группа>
+CONF_RATE_SMOOTHING = "rate_smoothing"  # окно EWMA для скоростей, секунды (0 — выкл.)
+CONF_STREAM_INTERVAL = "stream_interval"  # период снимков потока, секунды (0 — только опрос)
+CONF_ENTITY_RESOLUTION = "entity_resolution"  # raw или средние за 1m/1h в сущностях
+CONF_HISTORY_PERSIST = "history_persist"  # сохранять историю между перезапусками
+CONF_INTERFACE_INCLUDE = "interface_include"  # шаблоны интерфейсов с сенсорами (пусто — все)
+CONF_INTERFACE_EXCLUDE = "interface_exclude"  # шаблоны интерфейсов без сенсоров
+CONF_LOAD_THRESHOLD = "load_threshold"  # cpu_load_1, выше которого опрос замедляется (0 — выкл.)
+CONF_LATENCY_THRESHOLD = "latency_threshold"  # длительность опроса, секунды (0 — выкл.)
+CONF_CLIENT_TOP_N = "client_top_n"  # клиентов с сенсорами трафика (0 — не собирать)
+
+# SSH-бэкенды
+SSH_BACKEND_PARAMIKO = "paramiko"  # блокирующий, через пул потоков
+SSH_BACKEND_ASYNCSSH = "asyncssh"  # нативный asyncio, без потоков
+SSH_BACKENDS = [SSH_BACKEND_PARAMIKO, SSH_BACKEND_ASYNCSSH]
+DEFAULT_SSH_BACKEND = SSH_BACKEND_PARAMIKO
+
+# Другие транспорты (выбираются тем же полем ssh_backend)
+BACKEND_TELNET = "telnet"  # постоянная оболочка без шифрования
+BACKEND_HTTP = "http"  # JSON-RPC веб-интерфейса (ubus), keep-alive HTTP
+BACKEND_AUTO = "auto"  # при настройке выбрать самый быстрый из SSH-бэкендов
+BACKENDS = SSH_BACKENDS + [BACKEND_TELNET, BACKEND_HTTP]
+# Только шифрованные: telnet и http передают пароль открытым текстом, их выбирают явно
+PROBE_BACKENDS = [SSH_BACKEND_ASYNCSSH, SSH_BACKEND_PARAMIKO]
+CONF_TELNET_PORT = "telnet_port"
+CONF_HTTP_PORT = "http_port"
+CONF_HTTP_PATH = "http_path"
+DEFAULT_TELNET_PORT = 23
+DEFAULT_HTTP_PORT = 80
+DEFAULT_HTTP_PATH = "/jsonrpc"
+
+# Режим выполнения команд
+COMMAND_MODE_EXEC = "exec"  # отдельный канал на каждую команду
+COMMAND_MODE_SHELL = "shell"  # одна постоянная оболочка, команды пишутся конвейером
+COMMAND_MODES = [COMMAND_MODE_EXEC, COMMAND_MODE_SHELL]
+DEFAULT_COMMAND_MODE = COMMAND_MODE_EXEC
+
+# Постоянная SSH-сессия
+SSH_TIMEOUT = 10  # секунды (таймаут подключения и команд)
+SSH_KEEPALIVE_INTERVAL = 15  # секунды (keepalive-пакеты транспорта)
+RECONNECT_BACKOFF_MIN = 2  # секунды (первая пауза после неудачного подключения)
+RECONNECT_BACKOFF_MAX = 300  # секунды (максимальная пауза между попытками)
+PROBE_TIMEOUT = 2  # секунды (проверка TCP-порта перед полным рукопожатием)
+
+# Пакетное выполнение произвольных команд (execute_many)
+EXEC_MAX_CHANNELS = 4  # одновременных каналов в сессии (у старого dropbear их мало)
+EXEC_MAX_TIMEOUT = 300  # секунды (самый долгий таймаут команды в сервисе)
+
+# Размыкатель цепи: недоступный маршрутизатор не держит опрос таймаутами
+BREAKER_FAILURE_THRESHOLD = 3  # ошибок подряд до размыкания
+BREAKER_RESET_TIMEOUT = 30  # секунды (пауза до пробной попытки, удваивается)
+BREAKER_RESET_TIMEOUT_MAX = 600  # секунды (самая длинная пауза)
+
+# Адаптивный интервал опроса (настроенные интервалы — самые частые)
+DEFAULT_LOAD_THRESHOLD = 2.0  # cpu_load_1 одноядерного маршрутизатора
+DEFAULT_LATENCY_THRESHOLD = 5.0  # секунды (обычный опрос — доли секунды)
+ADAPTIVE_MAX_INTERVAL = 300  # секунды (самый редкий тик опроса)
+ADAPTIVE_STEP = 1.5  # во сколько раз замедляться или ускоряться за опрос
+ADAPTIVE_IDLE_RATIO = 0.5  # ниже этой доли порогов маршрутизатор считается свободным
+
+# Трафик клиентов по счётчикам conntrack
+DEFAULT_CLIENT_TOP_N = 5
+CLIENT_RANK_WINDOW = 600  # секунды (окно сглаживания скорости для выбора самых активных)
+
+# Потоковый сбор (цикл на маршрутизаторе присылает снимки сам)
+MIN_STREAM_INTERVAL = 0.5  # секунды (без дробного sleep — округление вверх)
+STREAM_STALL_FACTOR = 3  # снимков подряд без данных — поток считается зависшим
+STREAM_STALL_TIMEOUT_MIN = 10  # секунды (нижняя граница ожидания снимка)
+STREAM_REALTIME_SECTIONS = ["interfaces"]  # группы в каждом снимке, остальные — по своим интервалам
+
+# История метрик в памяти
+HISTORY_RAW_SAMPLES = 360  # последних сырых отсчётов каждой метрики
+HISTORY_MINUTE_BUCKETS = 360  # минутных агрегатов (6 часов)
+HISTORY_HOUR_BUCKETS = 168  # часовых агрегатов (неделя)
+HISTORY_SAVE_INTERVAL = 600  # секунды (как часто сохранять историю на диск)
+
+# Разрешение истории и значений сущностей
+RESOLUTION_RAW = "raw"
+RESOLUTION_MINUTE = "1m"
+RESOLUTION_HOUR = "1h"
+RESOLUTIONS = [RESOLUTION_RAW, RESOLUTION_MINUTE, RESOLUTION_HOUR]
+DEFAULT_ENTITY_RESOLUTION = RESOLUTION_MINUTE  # в recorder — по значению в минуту
+
+# Несколько маршрутизаторов
+MAX_CONCURRENT_SESSIONS = 4  # одновременно опрашиваемых маршрутизаторов
+FLEET_LATENCY_WINDOW = 500  # последних опросов в статистике длительности
+
+# Замеры длительности стадий опроса
+TIMING_WINDOW = 200  # последних замеров каждой стадии
+
+# Префикс уникальных ID до привязки к записи конфигурации
+LEGACY_UNIQUE_ID_PREFIX = "dlink_router_"
+
+# Сохранённый снимок для быстрого старта
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60  # секунды (снимок пишется не чаще раза в этот период)
+
+# Запросы обновления в пределах окна сливаются в один опрос
+REFRESH_COALESCE_WINDOW = 0.5  # секунды
+
+# Экспорт метрик для Prometheus (OpenMetrics)
+METRICS_URL = "/api/dlink_router/metrics"
+
+# Ключи hass.data
+DATA_FLEET = "fleet"
+
+# Сервисы
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_REFRESH = "refresh"
+SERVICE_RUN_COMMAND = "run_command"
\ No newline at end of file
@@ -1,58 +1,526 @@
 """Data coordinator for D-Link Router."""
 
 import logging
+import os
+import time
 from datetime import timedelta
+from typing import List, Optional, Set
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
+from .actions import RefreshCoalescer, WriteQueue
+from .adaptive import AdaptiveInterval
 from .api import DLinkRouterAPI
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+from .const import (
+    DOMAIN,
+    SECTION_INTERVALS,
+    CONF_INTERVAL_PREFIX,
+    CONF_RATE_SMOOTHING,
+    CONF_ENTITY_RESOLUTION,
+    CONF_INTERFACE_INCLUDE,
+    CONF_INTERFACE_EXCLUDE,
+    CONF_LOAD_THRESHOLD,
+    CONF_LATENCY_THRESHOLD,
+    CONF_CLIENT_TOP_N,
+    DEFAULT_INTERFACE_INCLUDE,
+    DEFAULT_INTERFACE_EXCLUDE,
+    DEFAULT_LOAD_THRESHOLD,
+    DEFAULT_LATENCY_THRESHOLD,
+    DEFAULT_CLIENT_TOP_N,
+    RESOLUTION_RAW,
+    DEFAULT_ENTITY_RESOLUTION,
+    SNAPSHOT_STORAGE_VERSION,
+    SNAPSHOT_SAVE_DELAY,
+    EVENT_DEVICE_JOINED,
+    EVENT_DEVICE_LEFT,
+    REFRESH_COALESCE_WINDOW,
+)
+from .devices import DeviceRegistry
+from .history import HistoryStore
+from .parsers import InterfaceFilter, parse_patterns
+from .rates import ClientTrafficCalculator, CpuUsageCalculator, InterfaceRateCalculator
+from .stream import DLinkStreamCollector
 
 _LOGGER = logging.getLogger(__name__)
 
+# Контекст слушателей, которым нужно знать о новых устройствах
+CONTEXT_DEVICES_JOINED = "devices_joined"
+
+# Контекст слушателей, которым нужно знать о появившихся и исчезнувших
+# интерфейсах, радиоинтерфейсах, ядрах CPU и самых активных клиентах
+CONTEXT_GROUPS_CHANGED = "groups_changed"
+
+# Группы данных с переменным составом сущностей: группа -> секция, из которой она берётся
+ENTITY_GROUPS = {
+    "interfaces": "interfaces",
+    "wireless": "wireless",
+    "cpu_cores": "cpu",
+    "clients": "clients",
+}
+
+# Контекст диагностических сенсоров длительности (обновляются каждый опрос)
+CONTEXT_TIMINGS = "timings"
+
+# Метрики с историей: группа -> ключи данных (плюс скорости каждого интерфейса)
+HISTORY_KEYS = {
+    "loadavg": ['cpu_load_1', 'cpu_load_5', 'cpu_load_15'],
+    "memory": ['memory_percentage'],
+    "devices": ['connected_devices_count'],
+    "cpu": ['cpu_usage'],
+    "conntrack": ['conntrack_percentage'],
+}
+
+
+def _plain(value):
+    """Запись разборщика — в словарь (для сохранения снимка)."""
+    return value.as_dict() if hasattr(value, "as_dict") else value
+
+
+def diff_snapshots(old: dict, new: dict) -> set:
+    """Ключи, значения которых изменились между двумя снимками."""
+    # Для вложенных словарей (interfaces) добавляем и ключ, и пары (ключ, подключ)
+    changed = set()
+    for key in old.keys() | new.keys():
+        old_value = old.get(key)
+        new_value = new.get(key)
+        if old_value is new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            for sub in old_value.keys() | new_value.keys():
+                old_sub = old_value.get(sub)
+                new_sub = new_value.get(sub)
+                # Записи разборщика обновляются на месте и сами помнят, изменились ли
+                if old_sub is new_sub:
+                    if not getattr(new_sub, 'changed', False):
+                        continue
+                elif old_sub == new_sub:
+                    continue
+                changed.add((key, sub))
+                changed.add(key)
+        elif old_value != new_value:
+            changed.add(key)
+    return changed
+
 
 class DLinkRouterDataUpdateCoordinator(DataUpdateCoordinator):
     """Координатор для обновления данных."""
     
-    def __init__(self, hass: HomeAssistant, api: DLinkRouterAPI):
+    def __init__(
+        self, hass: HomeAssistant, api: DLinkRouterAPI, entry: ConfigEntry, fleet
+    ):
         """Инициализация."""
         self.api = api
+        self.entry = entry
+        self.fleet = fleet
+        
+        # Свой интервал у каждой группы метрик; тик координатора — самый короткий
+        self.section_intervals = {
+            section: entry.options.get(f"{CONF_INTERVAL_PREFIX}{section}", default)
+            for section, default in SECTION_INTERVALS.items()
+        }
+        self._last_fetch = {}
+        
+        # Трафик клиентов собирается, только если им отведены сенсоры
+        client_top_n = entry.options.get(CONF_CLIENT_TOP_N, DEFAULT_CLIENT_TOP_N)
+        if not client_top_n:
+            self.section_intervals.pop("clients")
+        
+        # Неподходящие интерфейсы отсекаются ещё при разборе /proc/net/dev
+        self.interface_filter = InterfaceFilter(
+            parse_patterns(entry.options.get(CONF_INTERFACE_INCLUDE, DEFAULT_INTERFACE_INCLUDE)),
+            parse_patterns(entry.options.get(CONF_INTERFACE_EXCLUDE, DEFAULT_INTERFACE_EXCLUDE)),
+        )
+        api.set_interface_filter(self.interface_filter)
+        
+        # Скорости интерфейсов считаются по приращениям счётчиков
+        self.rates = InterfaceRateCalculator(entry.options.get(CONF_RATE_SMOOTHING, 0))
+        
+        # Загрузка CPU — по приращениям счётчиков /proc/stat
+        self.cpu = CpuUsageCalculator()
+        
+        # Трафик клиентов по MAC — по приращениям счётчиков соединений conntrack
+        self.clients = ClientTrafficCalculator(client_top_n)
+        
+        # Подключённые устройства по MAC
+        self.devices = DeviceRegistry()
+        
+        # История метрик; сущности показывают сырые значения или средние за интервал
+        self.history = HistoryStore()
+        self.entity_resolution = entry.options.get(CONF_ENTITY_RESOLUTION, DEFAULT_ENTITY_RESOLUTION)
+        
+        # Последний удачный снимок: по нему сущности создаются до связи с маршрутизатором
+        self._store = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry.entry_id}"
+        )
+        self._snapshot_saved = float("-inf")
+        
+        # Изменившиеся ключи последнего опроса (None — уведомить всех)
+        self._changed_keys = None
+        self.changed_keys_count = 0
+        
+        # Тик опроса; пока работает поток с маршрутизатора, опрос приостановлен
+        self.poll_interval = timedelta(seconds=min(self.section_intervals.values()))
+        self.stream = None
+        
+        # Тик и интервалы групп растягиваются при ошибках и нагрузке на маршрутизатор
+        self.adaptive = AdaptiveInterval(
+            self.poll_interval.total_seconds(),
+            entry.options.get(CONF_LOAD_THRESHOLD, DEFAULT_LOAD_THRESHOLD),
+            entry.options.get(CONF_LATENCY_THRESHOLD, DEFAULT_LATENCY_THRESHOLD),
+        )
+        
+        # Обновления по запросу сливаются в один опрос; команды записи идут по очереди
+        self.coalescer = RefreshCoalescer(self._async_refresh_sections, REFRESH_COALESCE_WINDOW)
+        self.writes = WriteQueue(self.coalescer)
+        self._requested_sections = None
         
         super().__init__(
             hass,
             _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            name=f"{DOMAIN} {api.host}",
+            update_interval=self.poll_interval,
+        )
+    
+    def _due_sections(self, now: float) -> List[str]:
+        """Группы, которым пора обновиться на этом тике."""
+        # Полтика допуска, чтобы группа 30 с при тике 5 с не съезжала на 35 с
+        scale = self.adaptive.scale
+        tolerance = self.adaptive.interval / 2
+        return [
+            section
+            for section, interval in self.section_intervals.items()
+            if section not in self._last_fetch
+            or now - self._last_fetch[section] >= interval * scale - tolerance
+        ]
+    
+    async def async_request_refresh(self) -> None:
+        """Обновить все группы; одновременные запросы сливаются в один опрос."""
+        await self.coalescer.async_request()
+    
+    async def async_request_sections(self, sections: Optional[Set[str]] = None):
+        """Обновить указанные группы (None — все) вместе с соседними запросами."""
+        await self.coalescer.async_request(sections)
+    
+    async def _async_refresh_sections(self, sections: Optional[Set[str]]):
+        """Внеочередной опрос групп, собранных окном запросов."""
+        self._requested_sections = (
+            list(self.section_intervals)
+            if sections is None
+            else [section for section in self.section_intervals if section in sections]
         )
+        await self.async_refresh()
+    
+    async def async_shutdown(self) -> None:
+        """Отменить ожидающие обновления по запросу и остановить опрос."""
+        self.coalescer.cancel()
+        await super().async_shutdown()
     
     async def _async_update_data(self):
         """Получить данные с маршрутизатора."""
-        try:
-            # Выполняем в отдельном потоке (не блокируем Home Assistant)
-            data = await self.hass.async_add_executor_job(
-                self._get_router_data
+        self._changed_keys = None
+        
+        # Опрос по запросу идёт сразу и только за нужными группами
+        requested = self._requested_sections
+        self._requested_sections = None
+        
+        # Разносим опросы маршрутизаторов по фазам и ограничиваем их одновременность
+        if requested is None:
+            await self.fleet.async_wait_phase(
+                self.entry.entry_id, self.poll_interval.total_seconds()
+            )
+        async with self.fleet.async_session_slot():
+            now = time.monotonic()
+            sections = self._due_sections(now) if requested is None else requested
+            
+            try:
+                # Сессия постоянная: API сам проверяет её и переподключается при обрыве.
+                # Бэкенд asyncssh работает в цикле событий, paramiko — в пуле потоков.
+                if not await self.api.async_connect():
+                    retry_in = self.api.breaker.retry_in
+                    if retry_in is not None:
+                        raise ConnectionError(
+                            f"Маршрутизатор недоступен, повтор через {retry_in:.0f} с"
+                        )
+                    raise ConnectionError("Не удалось подключиться к маршрутизатору")
+                
+                fresh = await self.api.async_get_system_info(sections)
+            except Exception as err:
+                self._adapt_interval(self.adaptive.failure())
+                raise UpdateFailed(f"Ошибка обновления: {err}")
+            finally:
+                elapsed = time.monotonic() - now
+                self.api.timings.add("poll", elapsed)
+                self.fleet.record_latency(elapsed)
+        
+        # Не пришла ни одна группа — для паузы это такая же ошибка
+        if sections and self.api.failed_sections.issuperset(sections):
+            self._adapt_interval(self.adaptive.failure())
+        else:
+            load = fresh.get('cpu_load_1', (self.data or {}).get('cpu_load_1'))
+            if 'loadavg' in self.api.failed_sections:
+                load = None
+            self._adapt_interval(self.adaptive.success(load, elapsed))
+        
+        return self._merge(fresh, sections, now)
+    
+    def _adapt_interval(self, seconds: float):
+        """Применить новый тик опроса (пока работает поток, опрос стоит)."""
+        if self.update_interval is None:
+            return
+        previous = self.update_interval.total_seconds()
+        if abs(seconds - previous) >= 1:
+            _LOGGER.debug(
+                "Интервал опроса %s: %.0f с (ошибок подряд: %s)",
+                self.api.host,
+                seconds,
+                self.adaptive.failures,
             )
-            return data
+        self.update_interval = timedelta(seconds=seconds)
+    
+    def _merge(self, fresh: dict, sections: List[str], now: float) -> dict:
+        """Влить свежие группы в прошлый снимок и отметить изменившиеся ключи."""
+        # Группы, которым не пора, сохраняют прошлые значения
+        for section in sections:
+            self._last_fetch[section] = now
+        # Соединения conntrack нужны только для подсчёта трафика, в снимок не попадают
+        flows = fresh.pop('client_flows', None)
+        data = dict(self.data or {})
+        data.update(fresh)
+        
+        # Время работы уменьшилось — маршрутизатор перезагрузился, счётчики обнулены
+        uptime = fresh.get('uptime_seconds')
+        if uptime and uptime < (self.data or {}).get('uptime_seconds', 0):
+            self.rates.reset()
+            self.cpu.reset()
+            self.clients.reset()
+        # Пустые группы по умолчанию (ошибка опроса) стёрли бы точку отсчёта скоростей
+        if 'interfaces' in fresh and 'interfaces' not in self.api.failed_sections:
+            data['rates'] = self.rates.update(fresh['interfaces'], time.monotonic())
+        if 'cpu_times' in fresh and 'cpu' not in self.api.failed_sections:
+            usage = self.cpu.update(fresh['cpu_times'])
+            data['cpu_usage'] = usage.get('cpu')
+            # Отдельные ядра — только на многоядерных маршрутизаторах
+            cores = {name: {'usage': value} for name, value in usage.items() if name != 'cpu'}
+            data['cpu_cores'] = cores if len(cores) > 1 else {}
+        
+        # Пришедшие и ушедшие устройства: события и адресные уведомления трекеров;
+        # пустая таблица по умолчанию (ошибка опроса) не значит, что все ушли
+        device_keys = set()
+        if 'connected_devices' in fresh and 'devices' not in self.api.failed_sections:
+            joined, left, moved = self.devices.update(fresh['connected_devices'])
+            device_keys = {("devices", mac) for mac in joined | left | moved}
+            if joined:
+                device_keys.add(CONTEXT_DEVICES_JOINED)
+            if self.data is not None:
+                self._fire_device_events(joined, left)
+        
+        # Клиент соединения узнаётся по IP из таблицы ARP
+        if flows is not None and 'clients' not in self.api.failed_sections:
+            data['clients'] = self.clients.update(flows, self.devices.by_ip(), time.monotonic())
+        
+        # Сенсоры интерфейсов, радио, ядер и клиентов добавляются и убираются без
+        # перезагрузки записи; секция по умолчанию (ошибка опроса) не значит, что они исчезли
+        for group, section in ENTITY_GROUPS.items():
+            if section not in sections or section in self.api.failed_sections:
+                continue
+            if data.get(group, {}).keys() != (self.data or {}).get(group, {}).keys():
+                device_keys.add(CONTEXT_GROUPS_CHANGED)
+        
+        # Значения по умолчанию неудачных секций — не отсчёты, в историю не идут
+        answered = [section for section in sections if section not in self.api.failed_sections]
+        closed = self.history.add(
+            self._history_samples(data, answered), time.time(), self.entity_resolution
+        )
+        
+        # Сравниваем с прошлым снимком; после ошибки уведомляем всех (доступность)
+        if self.data is not None:
+            changed = diff_snapshots(self.data, data)
+            self.changed_keys_count = sum(1 for key in changed if isinstance(key, str))
+            changed |= device_keys
+            changed.add(CONTEXT_TIMINGS)
+            # Сущности на агрегатах обновляются, только когда закрылся интервал
+            if self.entity_resolution != RESOLUTION_RAW:
+                changed -= self.history.contexts
+                changed |= closed
+            if self.last_update_success:
+                self._changed_keys = changed
+        
+        # async_delay_save откладывает запись при каждом вызове, поэтому ограничиваем сами
+        if now - self._snapshot_saved >= SNAPSHOT_SAVE_DELAY:
+            self._snapshot_saved = now
+            self._store.async_delay_save(self._snapshot)
+        
+        _LOGGER.debug(
+            "Данные обновлены (%s): %s (изменилось ключей: %s, рукопожатий SSH: %s, "
+            "переиспользований сессии: %s, опросы всех маршрутизаторов: %s)",
+            ", ".join(sections),
+            fresh,
+            self.changed_keys_count,
+            self.api.handshakes,
+            self.api.sessions_reused,
+            self.fleet.latency_stats,
+        )
+        return data
+    
+    async def async_restore_snapshot(self) -> bool:
+        """Восстановить последний удачный снимок; True — сущности можно создавать сразу."""
+        try:
+            stored = await self._store.async_load()
         except Exception as err:
-            raise UpdateFailed(f"Ошибка обновления: {err}")
+            _LOGGER.warning("Не удалось прочитать снимок %s: %s", self.api.host, err)
+            return False
+        if not stored or not stored.get("data"):
+            return False
+        
+        data = stored["data"]
+        # Фильтр интерфейсов мог измениться с момента сохранения
+        for group in ('interfaces', 'wireless'):
+            if group in data:
+                data[group] = {
+                    name: value
+                    for name, value in data[group].items()
+                    if self.interface_filter(name)
+                }
+        self.devices.restore(data.get('connected_devices', []))
+        self.data = data
+        _LOGGER.debug(
+            "Восстановлен снимок %s: интерфейсы %s",
+            self.api.host,
+            ", ".join(data.get('interfaces', {})),
+        )
+        return True
+    
+    def _snapshot(self) -> dict:
+        """Снимок для сохранения: записи разборщика превращаются в словари."""
+        data = dict(self.data or {})
+        if 'interfaces' in data:
+            data['interfaces'] = {
+                name: _plain(counters) for name, counters in data['interfaces'].items()
+            }
+        if 'connected_devices' in data:
+            data['connected_devices'] = [_plain(device) for device in data['connected_devices']]
+        return {"data": data}
+    
+    async def async_save_snapshot(self):
+        """Сохранить снимок сразу (при выгрузке записи)."""
+        if self.data:
+            await self._store.async_save(self._snapshot())
+    
+    @staticmethod
+    def _history_samples(data: dict, sections: List[str]) -> list:
+        """Отсчёты истории из свежих групп: (метрика, контекст сущности, значение)."""
+        samples = []
+        for section, keys in HISTORY_KEYS.items():
+            if section in sections:
+                samples.extend((key, key, data.get(key)) for key in keys)
+        if "interfaces" in sections:
+            for iface, rates in data.get('rates', {}).items():
+                samples.extend(
+                    (f"{iface}.{key}", ("rates", iface), value) for key, value in rates.items()
+                )
+        return samples
+    
+    def entity_value(self, metric: str, value):
+        """Значение для сущности: сырое или среднее последнего закрытого интервала."""
+        if self.entity_resolution == RESOLUTION_RAW:
+            return value
+        rolled = self.history.rollup_value(metric, self.entity_resolution)
+        return value if rolled is None else rolled
+    
+    @property
+    def _history_path(self) -> str:
+        return self.hass.config.path(STORAGE_DIR, f"{DOMAIN}.history.{self.entry.entry_id}")
     
-    def _get_router_data(self):
-        """Получить данные (синхронная функция)."""
+    def _load_history(self):
+        path = self._history_path
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                self.history.load(file.read())
+    
+    def _save_history(self, data: bytes):
+        path = self._history_path
+        with open(f"{path}.tmp", "wb") as file:
+            file.write(data)
+        os.replace(f"{path}.tmp", path)
+    
+    async def async_load_history(self):
+        """Восстановить историю с диска."""
         try:
-            # Подключаемся
-            if not self.api.connect():
-                raise ConnectionError("Не удалось подключиться к маршрутизатору")
-            
-            # Получаем данные
-            data = self.api.get_system_info()
-            
-            # Отключаемся
-            self.api.disconnect()
-            
-            _LOGGER.debug("Данные обновлены: %s", data)
-            return data
-            
+            await self.hass.async_add_executor_job(self._load_history)
         except Exception as err:
-            # В случае ошибки всё равно отключаемся
-            self.api.disconnect()
-            raise
\ No newline at end of file
+            _LOGGER.warning("Не удалось прочитать историю %s: %s", self.api.host, err)
+    
+    async def async_save_history(self, *_):
+        """Сохранить историю на диск (снимок делается в цикле событий)."""
+        try:
+            await self.hass.async_add_executor_job(self._save_history, self.history.dump())
+        except Exception as err:
+            _LOGGER.warning("Не удалось сохранить историю %s: %s", self.api.host, err)
+    
+    @callback
+    def async_start_stream(self, interval: float):
+        """Перейти на поток снимков с маршрутизатора (опрос остаётся запасным)."""
+        if not self.api.transport.supports_stream:
+            _LOGGER.warning(
+                "Транспорт %s не поддерживает поток снимков, %s опрашивается",
+                self.api.backend,
+                self.api.host,
+            )
+            return
+        self.stream = DLinkStreamCollector(self, interval)
+        self.stream.start()
+    
+    async def async_stop_stream(self):
+        """Остановить поток снимков."""
+        if self.stream is not None:
+            await self.stream.async_stop()
+            self.stream = None
+    
+    @callback
+    def async_handle_snapshot(self, outputs: dict):
+        """Применить снимок из потока: разбор, слияние и адресные уведомления."""
+        self._changed_keys = None
+        now = time.monotonic()
+        sections = list(outputs)
+        with self.api.timings.measure("parse"):
+            fresh = self.api.parse_sections(outputs, sections)
+        
+        if self.update_interval is not None:
+            _LOGGER.info("Поток данных с %s работает, опрос приостановлен", self.api.host)
+            self.update_interval = None
+        self.async_set_updated_data(self._merge(fresh, sections, now))
+    
+    @callback
+    def async_stream_stalled(self):
+        """Поток завис или оборвался — возобновить опрос."""
+        if self.update_interval is None:
+            self.update_interval = timedelta(seconds=self.adaptive.interval)
+            self.hass.async_create_task(self.async_request_refresh())
+    
+    def _fire_device_events(self, joined, left):
+        """События шины о пришедших и ушедших устройствах."""
+        for mac in joined:
+            device = self.devices.get(mac)
+            self.hass.bus.async_fire(
+                EVENT_DEVICE_JOINED,
+                {"host": self.api.host, "mac": mac, "ip": device['ip']},
+            )
+        for mac in left:
+            self.hass.bus.async_fire(EVENT_DEVICE_LEFT, {"host": self.api.host, "mac": mac})
+    
+    @callback
+    def async_update_listeners(self) -> None:
+        """Уведомить только сущности, чьи данные изменились."""
+        # Контекст сущности — её ключ данных; сущности без контекста
+        # (подключение, перезагрузка) обновляются только при полном уведомлении
+        changed = self._changed_keys
+        self._changed_keys = None
+        if changed is None:
+            super().async_update_listeners()
+            return
+        
+        for update_callback, context in list(self._listeners.values()):
+            if context is not None and context in changed:
+                update_callback()
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Device tracker platform for D-Link Router."""
+
+import logging
+from homeassistant.components.device_tracker import SourceType
+from homeassistant.components.device_tracker.config_entry import ScannerEntity
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import CONTEXT_DEVICES_JOINED
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Установка трекеров устройств."""
+    
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    tracked = set()
+    
+    # Восстанавливаем трекеры устройств, которые видели раньше
+    prefix = f"{entry.entry_id}_"
+    registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity_entry.domain == "device_tracker" and entity_entry.unique_id.startswith(
+            prefix
+        ):
+            tracked.add(entity_entry.unique_id[len(prefix):])
+    
+    async_add_entities(DLinkDeviceTracker(coordinator, mac) for mac in tracked)
+    
+    @callback
+    def async_add_new_devices():
+        """Добавить трекеры для впервые увиденных устройств."""
+        new = coordinator.devices.macs() - tracked
+        if new:
+            tracked.update(new)
+            async_add_entities(DLinkDeviceTracker(coordinator, mac) for mac in new)
+    
+    async_add_new_devices()
+    entry.async_on_unload(
+        coordinator.async_add_listener(async_add_new_devices, CONTEXT_DEVICES_JOINED)
+    )
+
+
+class DLinkDeviceTracker(CoordinatorEntity, ScannerEntity):
+    """Устройство в сети маршрутизатора (по таблице ARP)."""
+    
+    def __init__(self, coordinator, mac):
+        """Инициализация."""
+        super().__init__(coordinator, context=("devices", mac))
+        self._mac = mac
+        self._attr_name = f"D-Link {mac}"
+    
+    @property
+    def unique_id(self):
+        """Уникальный ID в рамках записи конфигурации."""
+        return f"{self.coordinator.entry.entry_id}_{self._mac}"
+    
+    @property
+    def source_type(self):
+        """Источник — маршрутизатор."""
+        return SourceType.ROUTER
+    
+    @property
+    def is_connected(self):
+        """Есть ли устройство в таблице ARP."""
+        return self._mac in self.coordinator.devices
+    
+    @property
+    def mac_address(self):
+        """MAC-адрес."""
+        return self._mac
+    
+    @property
+    def ip_address(self):
+        """IP-адрес."""
+        device = self.coordinator.devices.get(self._mac)
+        return device['ip'] if device else None
+    
+    @property
+    def extra_state_attributes(self):
+        """Интерфейс, через который видно устройство."""
+        device = self.coordinator.devices.get(self._mac)
+        return {"interface": device['interface']} if device else {}
\ No newline at end of file
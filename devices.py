@@ -0,0 +1,61 @@
+"""Connected device registry for D-Link Router."""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from .parsers import ArpEntry
+
+
+class DeviceRegistry:
+    """Подключённые устройства по MAC с разницей между снимками ARP."""
+    
+    def __init__(self):
+        """Инициализация."""
+        self._devices = {}
+    
+    def __contains__(self, mac: str) -> bool:
+        """Подключено ли устройство сейчас."""
+        return mac in self._devices
+    
+    def __len__(self) -> int:
+        """Количество подключённых устройств."""
+        return len(self._devices)
+    
+    def get(self, mac: str) -> Optional[ArpEntry]:
+        """Запись устройства по MAC."""
+        return self._devices.get(mac)
+    
+    def macs(self) -> Set[str]:
+        """MAC-адреса подключённых устройств."""
+        return set(self._devices)
+    
+    def by_ip(self) -> Dict[bytes, str]:
+        """MAC подключённых устройств по IP (IP в байтах, как в выводе маршрутизатора)."""
+        return {
+            device.ip.encode(): mac for mac, device in self._devices.items() if device.ip
+        }
+    
+    def restore(self, devices: List[Dict]):
+        """Заполнить по сохранённому снимку (до первого живого опроса)."""
+        for device in devices:
+            entry = ArpEntry(device['mac'])
+            entry.ip = device.get('ip')
+            entry.flags = device.get('flags', 0)
+            entry.interface = device.get('interface')
+            entry.changed = False
+            self._devices[entry.mac] = entry
+    
+    def update(self, devices: List[ArpEntry]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """Принять снимок ARP; вернуть MAC пришедших, ушедших и сменивших IP/интерфейс."""
+        current = {device.mac: device for device in devices}
+        
+        # Записи ARP переиспользуются между опросами и сами отмечают изменения
+        joined = current.keys() - self._devices.keys()
+        left = self._devices.keys() - current.keys()
+        changed = {
+            mac
+            for mac in current.keys() & self._devices.keys()
+            if current[mac] is not self._devices[mac] or current[mac].changed
+        }
+        
+        self._devices = current
+        return joined, left, changed
\ No newline at end of file
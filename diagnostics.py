@@ -0,0 +1,70 @@
+"""Diagnostics support for D-Link Router."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import async_get_fleet
+from .const import DOMAIN
+from .coordinator import _plain
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Диагностика записи: соединение, расписание опроса, замеры и последний снимок."""
+    
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    api = data["api"]
+    
+    # MAC и IP клиентов в выгрузку не попадают, только их число
+    snapshot = {
+        key: value
+        for key, value in (coordinator.data or {}).items()
+        if key not in ("connected_devices", "clients")
+    }
+    if "interfaces" in snapshot:
+        # После восстановления снимка здесь словари, а не записи разборщика
+        snapshot["interfaces"] = {
+            name: _plain(counters) for name, counters in snapshot["interfaces"].items()
+        }
+    
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "connection": {
+            "backend": api.backend,
+            "command_mode": api.command_mode,
+            "connected": api.is_connected,
+            "handshakes": api.handshakes,
+            "sessions_reused": api.sessions_reused,
+            "parse_skipped": api.parse_skipped,
+            "breaker": api.breaker.as_dict(),
+        },
+        "polling": {
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval is not None
+            else None,
+            "section_intervals": coordinator.section_intervals,
+            "interval_scale": round(coordinator.adaptive.scale, 2),
+            "consecutive_failures": coordinator.adaptive.failures,
+            "last_update_success": coordinator.last_update_success,
+            "changed_keys_count": coordinator.changed_keys_count,
+            "refresh_requests": coordinator.coalescer.requests,
+            "coalesced_refreshes": coordinator.coalescer.refreshes,
+            "pending_writes": coordinator.writes.pending,
+        },
+        "stream": {
+            "active": stream.active,
+            "interval": stream.interval,
+            "snapshots": stream.snapshots,
+            "fallbacks": stream.fallbacks,
+        }
+        if (stream := coordinator.stream) is not None
+        else None,
+        "timings": api.timings.summary(),
+        "fleet_poll_latency": async_get_fleet(hass).latency_stats,
+        "history": coordinator.history.query(),
+        "data": snapshot,
+    }
\ No newline at end of file
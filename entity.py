@@ -0,0 +1,24 @@
+"""Base entity for D-Link Router."""
+
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, DEFAULT_NAME
+
+
+class DLinkEntity(CoordinatorEntity):
+    """Сущность маршрутизатора: ID и устройство привязаны к записи конфигурации."""
+    
+    _attr_has_entity_name = True
+    
+    def __init__(self, coordinator, key, context=None):
+        """Инициализация."""
+        super().__init__(coordinator, context=context)
+        entry = coordinator.entry
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="D-Link",
+            model=DEFAULT_NAME,
+        )
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""Time-series history with rollups for D-Link Router."""
+
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .const import (
+    HISTORY_RAW_SAMPLES,
+    HISTORY_MINUTE_BUCKETS,
+    HISTORY_HOUR_BUCKETS,
+    RESOLUTION_RAW,
+    RESOLUTION_MINUTE,
+    RESOLUTION_HOUR,
+)
+
+# Формат сохранения: заголовок, затем метрики подряд
+_MAGIC = b"DLHI"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_NAME = struct.Struct("<H")
+_RING = struct.Struct("<II")
+
+
+class RingBuffer:
+    """Кольцевой буфер из массивов double: по массиву на поле."""
+    
+    def __init__(self, fields: Tuple[str, ...], size: int):
+        """Инициализация."""
+        self.fields = fields
+        self.size = size
+        self._columns = [array('d', bytes(8 * size)) for _ in fields]
+        self._head = 0
+        self._count = 0
+    
+    def __len__(self) -> int:
+        """Количество записей."""
+        return self._count
+    
+    def append(self, *values: float):
+        """Добавить запись, вытеснив самую старую."""
+        for column, value in zip(self._columns, values):
+            column[self._head] = value
+        self._head = (self._head + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+    
+    def last(self) -> Optional[Tuple[float, ...]]:
+        """Последняя запись."""
+        if not self._count:
+            return None
+        index = (self._head - 1) % self.size
+        return tuple(column[index] for column in self._columns)
+    
+    def rows(self, since: float = 0) -> Iterator[Tuple[float, ...]]:
+        """Записи от старых к новым (первое поле — время)."""
+        start = (self._head - self._count) % self.size
+        for offset in range(self._count):
+            index = (start + offset) % self.size
+            if self._columns[0][index] >= since:
+                yield tuple(column[index] for column in self._columns)
+    
+    def dump(self) -> bytes:
+        """Компактное двоичное представление."""
+        rows = list(self.rows())
+        columns = [array('d', (row[i] for row in rows)) for i in range(len(self.fields))]
+        return _RING.pack(self.size, len(rows)) + b"".join(c.tobytes() for c in columns)
+    
+    def load(self, data: bytes, offset: int) -> int:
+        """Восстановить записи из dump(); вернуть смещение за ними."""
+        _size, count = _RING.unpack_from(data, offset)
+        offset += _RING.size
+        columns = []
+        for _ in self.fields:
+            column = array('d')
+            column.frombytes(data[offset:offset + 8 * count])
+            columns.append(column)
+            offset += 8 * count
+        for row in zip(*columns):
+            self.append(*row)
+        return offset
+
+
+class Rollup:
+    """Агрегаты min/max/avg по интервалам фиксированной длины."""
+    
+    FIELDS = ("ts", "min", "max", "avg", "count")
+    
+    def __init__(self, period: int, size: int):
+        """Инициализация (period — длина интервала, секунды)."""
+        self.period = period
+        self.buckets = RingBuffer(self.FIELDS, size)
+        self._start = None
+        self._min = self._max = self._sum = 0.0
+        self._count = 0
+    
+    def add(self, timestamp: float, value: float) -> bool:
+        """Учесть отсчёт; True — закрылся очередной интервал."""
+        start = timestamp - timestamp % self.period
+        closed = False
+        if self._start is not None and start != self._start and self._count:
+            self.buckets.append(
+                self._start, self._min, self._max, self._sum / self._count, self._count
+            )
+            closed = True
+        if start != self._start:
+            self._start = start
+            self._min = self._max = value
+            self._sum = 0.0
+            self._count = 0
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._sum += value
+        self._count += 1
+        return closed
+    
+    def last_avg(self) -> Optional[float]:
+        """Среднее последнего закрытого интервала."""
+        last = self.buckets.last()
+        return last[3] if last else None
+
+
+class MetricHistory:
+    """История одной метрики: сырые отсчёты и агрегаты за 1 мин и 1 ч."""
+    
+    def __init__(self, context):
+        """Инициализация (context — контекст сущностей, показывающих метрику)."""
+        self.context = context
+        self.raw = RingBuffer(("ts", "value"), HISTORY_RAW_SAMPLES)
+        self.minute = Rollup(60, HISTORY_MINUTE_BUCKETS)
+        self.hour = Rollup(3600, HISTORY_HOUR_BUCKETS)
+        # Промежуток между двумя последними отсчётами (None — отсчёт пока один)
+        self.interval = None
+    
+    def rollup(self, resolution: str) -> Rollup:
+        """Агрегаты разрешения 1m или 1h."""
+        return self.minute if resolution == RESOLUTION_MINUTE else self.hour
+    
+    def sparse(self, resolution: str) -> bool:
+        """Отсчёты не чаще интервала агрегата: в нём по одному, среднее лишь запаздывает."""
+        return self.interval is None or self.interval >= self.rollup(resolution).period
+    
+    def add(self, timestamp: float, value: float) -> Set[str]:
+        """Добавить отсчёт; вернуть разрешения, у которых закрылся интервал."""
+        last = self.raw.last()
+        self.interval = timestamp - last[0] if last else None
+        self.raw.append(timestamp, value)
+        closed = set()
+        if self.minute.add(timestamp, value):
+            closed.add(RESOLUTION_MINUTE)
+        if self.hour.add(timestamp, value):
+            closed.add(RESOLUTION_HOUR)
+        return closed
+    
+    def rows(self, resolution: str, since: float = 0) -> List[Dict]:
+        """Отсчёты или агрегаты указанного разрешения."""
+        if resolution == RESOLUTION_RAW:
+            return [{"ts": ts, "value": value} for ts, value in self.raw.rows(since)]
+        return [
+            dict(zip(Rollup.FIELDS, row)) for row in self.rollup(resolution).buckets.rows(since)
+        ]
+
+
+class HistoryStore:
+    """История всех метрик маршрутизатора."""
+    
+    def __init__(self):
+        """Инициализация."""
+        self.metrics: Dict[str, MetricHistory] = {}
+    
+    def add(
+        self, samples: List[Tuple[str, object, float]], timestamp: float, resolution: str
+    ) -> Set:
+        """Добавить отсчёты (метрика, контекст, значение).
+        
+        Возвращает контексты метрик, у которых закрылся интервал resolution, и редких
+        метрик (опрос не чаще интервала): их сущности обновляются каждым отсчётом.
+        """
+        contexts = set()
+        for metric, context, value in samples:
+            if value is None:
+                continue
+            history = self.metrics.get(metric)
+            if history is None:
+                history = self.metrics[metric] = MetricHistory(context)
+            history.context = context
+            closed = history.add(timestamp, float(value))
+            if resolution in closed or history.sparse(resolution):
+                contexts.add(context)
+        return contexts
+    
+    @property
+    def contexts(self) -> Set:
+        """Контексты всех метрик с историей."""
+        return {
+            history.context
+            for history in self.metrics.values()
+            if history.context is not None
+        }
+    
+    def rollup_value(self, metric: str, resolution: str) -> Optional[float]:
+        """Среднее последнего закрытого интервала метрики (None — показывать текущее)."""
+        history = self.metrics.get(metric)
+        if history is None or history.sparse(resolution):
+            return None
+        value = history.rollup(resolution).last_avg()
+        return round(value, 2) if value is not None else None
+    
+    def query(
+        self, metric: Optional[str] = None, resolution: str = RESOLUTION_RAW, since: float = 0
+    ) -> Dict[str, List[Dict]]:
+        """История одной или всех метрик."""
+        return {
+            name: history.rows(resolution, since)
+            for name, history in sorted(self.metrics.items())
+            if metric is None or name == metric
+        }
+    
+    def dump(self) -> bytes:
+        """Сохранить все метрики в компактном двоичном виде."""
+        # Контекст не сохраняется: его восстановит первое же добавление отсчёта
+        parts = [_HEADER.pack(_MAGIC, _VERSION, len(self.metrics))]
+        for name, history in self.metrics.items():
+            encoded = name.encode()
+            parts.append(_NAME.pack(len(encoded)) + encoded)
+            for ring in (history.raw, history.minute.buckets, history.hour.buckets):
+                parts.append(ring.dump())
+        return b"".join(parts)
+    
+    def load(self, data: bytes):
+        """Восстановить метрики из dump(); чужой формат игнорируется."""
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            return
+        offset = _HEADER.size
+        for _ in range(count):
+            (length,) = _NAME.unpack_from(data, offset)
+            offset += _NAME.size
+            name = data[offset:offset + length].decode()
+            offset += length
+            history = self.metrics[name] = MetricHistory(None)
+            for ring in (history.raw, history.minute.buckets, history.hour.buckets):
+                offset = ring.load(data, offset)
\ No newline at end of file
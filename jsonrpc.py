@@ -0,0 +1,196 @@
+"""HTTP JSON-RPC (ubus) transport for D-Link Router."""
+
+import asyncio
+import itertools
+import logging
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+from .const import SSH_TIMEOUT, DEFAULT_HTTP_PATH
+from .transport import BaseTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+# Сессия до входа (ubus)
+_ANONYMOUS_SESSION = "0" * 32
+
+# Коды ubus и JSON-RPC, означающие истёкшую или чужую сессию
+_UBUS_PERMISSION_DENIED = 6
+_RPC_ACCESS_DENIED = -32002
+
+
+class SessionExpired(Exception):
+    """Сессия веб-интерфейса истекла; нужен повторный вход."""
+
+
+class JsonRpcTransport(BaseTransport):
+    """JSON-RPC веб-интерфейса (ubus): команды через file.exec по keep-alive HTTP."""
+    
+    # Долгую команду по HTTP не запустить: поток снимков недоступен
+    supports_stream = False
+    
+    def __init__(self, *args, path: str = DEFAULT_HTTP_PATH, **kwargs):
+        """Инициализация (path — адрес JSON-RPC на маршрутизаторе)."""
+        super().__init__(*args, **kwargs)
+        self.path = path
+        self._session = None
+        self._sid = None
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+    
+    @property
+    def url(self) -> str:
+        """Адрес JSON-RPC."""
+        return f"http://{self.host}:{self.port}{self.path}"
+    
+    @property
+    def is_connected(self) -> bool:
+        """Есть ли сессия веб-интерфейса."""
+        return self._sid is not None and self._session is not None and not self._session.closed
+    
+    def _request(self, sid: str, obj: str, method: str, params: dict) -> dict:
+        """Запрос ubus call."""
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": "call",
+            "params": [sid, obj, method, params],
+        }
+    
+    async def _async_post(self, payload, timeout: float):
+        """Отправить запрос (или пакет запросов) по общему keep-alive соединению."""
+        if self._session is None or self._session.closed:
+            # Одно соединение на маршрутизатор: запросы идут по нему по очереди
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=1, force_close=False)
+            )
+        async with self._session.post(
+            self.url, json=payload, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+    
+    @staticmethod
+    def _result(reply: dict):
+        """Данные ответа ubus; SessionExpired — нужен повторный вход."""
+        error = reply.get("error")
+        if error:
+            if error.get("code") == _RPC_ACCESS_DENIED:
+                raise SessionExpired(error.get("message"))
+            raise RuntimeError(f"Ошибка JSON-RPC: {error.get('message')}")
+        result = reply.get("result") or [None]
+        if result[0] == _UBUS_PERMISSION_DENIED:
+            raise SessionExpired("Доступ запрещён")
+        if result[0]:
+            raise RuntimeError(f"Ошибка ubus: код {result[0]}")
+        return result[1] if len(result) > 1 else {}
+    
+    async def async_connect(self) -> bool:
+        """Войти в веб-интерфейс (или переиспользовать сессию)."""
+        async with self._lock:
+            if self.is_connected:
+                self.sessions_reused += 1
+                return True
+            
+            if not self._may_attempt():
+                return False
+            
+            try:
+                with self.timings.measure("handshake"):
+                    reply = await self._async_post(
+                        self._request(
+                            _ANONYMOUS_SESSION,
+                            "session",
+                            "login",
+                            {"username": self.username, "password": self.password},
+                        ),
+                        SSH_TIMEOUT,
+                    )
+                    self._sid = self._result(reply)["ubus_rpc_session"]
+                self._connected()
+                return True
+            except Exception as err:
+                self._connect_failed(err)
+                return False
+    
+    async def async_close(self):
+        """Закрыть HTTP-соединение (сессия на маршрутизаторе истечёт сама)."""
+        async with self._lock:
+            self._sid = None
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+    
+    def _exec_request(self, command: str) -> dict:
+        """Запрос file.exec: команда выполняется оболочкой маршрутизатора."""
+        return self._request(
+            self._sid, "file", "exec", {"command": "/bin/sh", "params": ["-c", command]}
+        )
+    
+    async def async_run_pipelined(
+        self, commands: List[str], timeout: float = SSH_TIMEOUT, raw: bool = False
+    ) -> List:
+        """Выполнить команды одним пакетным запросом JSON-RPC."""
+        for attempt in range(2):
+            if not await self.async_connect():
+                raise ConnectionError("Не удалось подключиться")
+            
+            try:
+                replies = await self._async_post(
+                    [self._exec_request(command) for command in commands], timeout
+                )
+                results = []
+                for reply in sorted(replies, key=lambda reply: reply.get("id", 0)):
+                    output = self._result(reply).get("stdout", "")
+                    results.append(output.encode() if raw else output.strip())
+                return results
+            except SessionExpired:
+                # Сессия истекла по таймауту маршрутизатора: входим заново один раз
+                self._sid = None
+                if attempt == 0:
+                    _LOGGER.debug("Сессия JSON-RPC на %s истекла, входим заново", self.host)
+                    continue
+                raise
+            except (aiohttp.ClientError, OSError) as err:
+                if attempt == 0:
+                    _LOGGER.debug("Соединение с %s оборвалось (%s), повторяем", self.host, err)
+                    await self.async_close()
+                    continue
+                _LOGGER.error("Ошибка выполнения команд по JSON-RPC: %s", err)
+                raise
+    
+    async def _async_exec(self, command: str, timeout: float) -> Tuple[Optional[int], bytes, bytes]:
+        """Выполнить команду: file.exec сам отдаёт код выхода, stdout и stderr."""
+        for attempt in range(2):
+            if not await self.async_connect():
+                raise ConnectionError("Не удалось подключиться")
+            
+            try:
+                reply = self._result(await self._async_post(self._exec_request(command), timeout))
+            except SessionExpired:
+                self._sid = None
+                if attempt == 0:
+                    continue
+                raise
+            except (aiohttp.ClientError, OSError) as err:
+                if attempt == 0:
+                    _LOGGER.debug("Соединение с %s оборвалось (%s), повторяем", self.host, err)
+                    await self.async_close()
+                    continue
+                raise
+            return (
+                reply.get("code"),
+                reply.get("stdout", "").encode(),
+                reply.get("stderr", "").encode(),
+            )
+    
+    async def async_run(self, command: str, timeout: float = SSH_TIMEOUT, raw: bool = False):
+        """Выполнить команду."""
+        return (await self.async_run_pipelined([command], timeout, raw))[0]
+    
+    async def async_open_stream(self, command: str):
+        """Поток снимков по HTTP не поддерживается."""
+        raise ConnectionError(
+            f"Поток снимков с {self.host} недоступен через JSON-RPC, нужен SSH или telnet"
+        )
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""OpenMetrics export for D-Link Router."""
+
+from typing import Dict, Iterable, List, Tuple
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_FLEET, METRICS_URL
+from .parsers import NET_DEV_FIELDS
+from .rates import RATE_COUNTERS
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_PREFIX = "dlink_router"
+_MEBIBYTE = 1024 * 1024
+
+# Семейства метрик в порядке вывода: имя -> (тип, описание)
+FAMILIES = {
+    "up": ("gauge", "Whether the last poll of the router succeeded."),
+    "load1": ("gauge", "1-minute load average."),
+    "load5": ("gauge", "5-minute load average."),
+    "load15": ("gauge", "15-minute load average."),
+    "cpu_busy_percent": ("gauge", "CPU busy time between the last two polls."),
+    "memory_total_bytes": ("gauge", "Total memory."),
+    "memory_used_bytes": ("gauge", "Used memory."),
+    "memory_free_bytes": ("gauge", "Free memory."),
+    "uptime_seconds": ("gauge", "Time since the router booted."),
+    "connected_devices": ("gauge", "Devices in the ARP table."),
+    "conntrack_entries": ("gauge", "Tracked connections."),
+    "conntrack_entries_limit": ("gauge", "Connection tracking table size."),
+    "wireless_stations": ("gauge", "Associated wireless stations."),
+    "wireless_signal_dbm": ("gauge", "Average signal of associated stations."),
+    **{
+        f"interface_{field}": ("counter", f"/proc/net/dev {field} counter.")
+        for field in NET_DEV_FIELDS
+    },
+    **{
+        f"interface_{rate_key}": ("gauge", f"Interface {rate_key} between the last two polls.")
+        for rate_key, _, _ in RATE_COUNTERS.values()
+    },
+    "client_download_bytes": ("counter", "Bytes received by the client since tracking began."),
+    "client_upload_bytes": ("counter", "Bytes sent by the client since tracking began."),
+    "client_download_bps": ("gauge", "Client download rate between the last two polls."),
+    "client_upload_bps": ("gauge", "Client upload rate between the last two polls."),
+}
+
+# Простые значения снимка: семейство -> (ключ данных, множитель)
+_SCALARS = {
+    "load1": ('cpu_load_1', 1),
+    "load5": ('cpu_load_5', 1),
+    "load15": ('cpu_load_15', 1),
+    "memory_total_bytes": ('memory_total', _MEBIBYTE),
+    "memory_used_bytes": ('memory_used', _MEBIBYTE),
+    "memory_free_bytes": ('memory_free', _MEBIBYTE),
+    "uptime_seconds": ('uptime_seconds', 1),
+    "connected_devices": ('connected_devices_count', 1),
+    "conntrack_entries": ('conntrack_count', 1),
+    "conntrack_entries_limit": ('conntrack_max', 1),
+}
+
+
+def _escape(value) -> str:
+    """Значение метки по правилам OpenMetrics."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    """Метки сэмпла через запятую."""
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def router_samples(host: str, data: dict, up: bool) -> Dict[str, List[str]]:
+    """Строки сэмплов одного маршрутизатора по семействам."""
+    samples = {family: [] for family in FAMILIES}
+    router = _labels(router=host)
+    
+    def add(family: str, labels: str, value):
+        if value is None:
+            return
+        suffix = "_total" if FAMILIES[family][0] == "counter" else ""
+        samples[family].append(f"{_PREFIX}_{family}{suffix}{{{labels}}} {value}")
+    
+    add("up", router, 1 if up else 0)
+    for family, (key, scale) in _SCALARS.items():
+        value = data.get(key)
+        add(family, router, value * scale if value is not None and scale != 1 else value)
+    
+    add("cpu_busy_percent", f'{router},{_labels(cpu="cpu")}', data.get('cpu_usage'))
+    for core, values in data.get('cpu_cores', {}).items():
+        add("cpu_busy_percent", f'{router},{_labels(cpu=core)}', values.get('usage'))
+    
+    for radio, values in data.get('wireless', {}).items():
+        labels = f'{router},{_labels(radio=radio)}'
+        add("wireless_stations", labels, values.get('stations'))
+        add("wireless_signal_dbm", labels, values.get('signal'))
+    
+    # Записи разборщика и словари восстановленного снимка читаются одинаково
+    for iface, counters in data.get('interfaces', {}).items():
+        labels = f'{router},{_labels(interface=iface)}'
+        for field in NET_DEV_FIELDS:
+            add(f"interface_{field}", labels, counters.get(field))
+    for iface, rates in data.get('rates', {}).items():
+        labels = f'{router},{_labels(interface=iface)}'
+        for rate_key, value in rates.items():
+            add(f"interface_{rate_key}", labels, value)
+    
+    for mac, client in data.get('clients', {}).items():
+        labels = f'{router},{_labels(mac=mac, ip=client.get("ip") or "")}'
+        add("client_download_bytes", labels, client.get('download'))
+        add("client_upload_bytes", labels, client.get('upload'))
+        add("client_download_bps", labels, client.get('download_rate'))
+        add("client_upload_bps", labels, client.get('upload_rate'))
+    return samples
+
+
+class MetricsRenderer:
+    """Текст OpenMetrics по снимкам маршрутизаторов; пересчёт только при новом снимке."""
+    
+    def __init__(self):
+        """Инициализация."""
+        # ID записи -> (снимок, успешность опроса, сэмплы); снимок сравнивается по is
+        self._routers = {}
+        self._body = None
+        self.renders = 0
+        self.cache_hits = 0
+    
+    def render(self, routers: Iterable[Tuple[str, str, dict, bool]]) -> bytes:
+        """Тело ответа по (ID записи, адрес, снимок, успешность опроса) всех маршрутизаторов."""
+        changed = False
+        seen = set()
+        for entry_id, host, data, up in routers:
+            seen.add(entry_id)
+            cached = self._routers.get(entry_id)
+            if cached is not None and cached[0] is data and cached[1] == up:
+                continue
+            self._routers[entry_id] = (data, up, router_samples(host, data or {}, up))
+            changed = True
+        for entry_id in self._routers.keys() - seen:
+            del self._routers[entry_id]
+            changed = True
+        
+        # Опросов не было с прошлого запроса — отдаём готовые байты
+        if not changed and self._body is not None:
+            self.cache_hits += 1
+            return self._body
+        
+        # В OpenMetrics сэмплы семейства идут подряд, поэтому маршрутизаторы сводятся по семействам
+        lines = []
+        for family, (kind, description) in FAMILIES.items():
+            family_lines = [
+                line for _, _, samples in self._routers.values() for line in samples[family]
+            ]
+            if not family_lines:
+                continue
+            lines.append(f"# TYPE {_PREFIX}_{family} {kind}")
+            lines.append(f"# HELP {_PREFIX}_{family} {description}")
+            lines.extend(family_lines)
+        lines.append("# EOF\n")
+        self._body = "\n".join(lines).encode()
+        self.renders += 1
+        return self._body
+
+
+class DLinkMetricsView(HomeAssistantView):
+    """Метрики всех маршрутизаторов в формате OpenMetrics для Prometheus."""
+    
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+    
+    def __init__(self, hass: HomeAssistant):
+        """Инициализация."""
+        self.hass = hass
+        self.renderer = MetricsRenderer()
+    
+    async def get(self, request: web.Request) -> web.Response:
+        """Последние снимки координаторов, без обращения к маршрутизаторам."""
+        routers = []
+        for entry_id, data in self.hass.data.get(DOMAIN, {}).items():
+            if entry_id == DATA_FLEET:
+                continue
+            coordinator = data["coordinator"]
+            routers.append(
+                (entry_id, coordinator.api.host, coordinator.data, coordinator.last_update_success)
+            )
+        return web.Response(
+            body=self.renderer.render(routers),
+            headers={"Content-Type": OPENMETRICS_CONTENT_TYPE},
+        )
\ No newline at end of file
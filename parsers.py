@@ -0,0 +1,235 @@
+"""Byte-level parsers for /proc/net/dev and /proc/net/arp."""
+
+import fnmatch
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Колонки /proc/net/dev после "имя:" по порядку
+NET_DEV_FIELDS = (
+    'rx_bytes',
+    'rx_packets',
+    'rx_errors',
+    'rx_dropped',
+    'rx_fifo',
+    'rx_frame',
+    'rx_compressed',
+    'rx_multicast',
+    'tx_bytes',
+    'tx_packets',
+    'tx_errors',
+    'tx_dropped',
+    'tx_fifo',
+    'tx_collisions',
+    'tx_carrier',
+    'tx_compressed',
+)
+_NET_DEV_KEYS = frozenset(NET_DEV_FIELDS)
+
+ARP_FIELDS = ('ip', 'mac', 'flags', 'interface')
+_ARP_KEYS = frozenset(ARP_FIELDS)
+
+_EMPTY_MAC = b"00:00:00:00:00:00"
+_ARP_HEADER = b"IP address"
+
+
+def parse_patterns(text: str) -> List[str]:
+    """Шаблоны из строки опции: через запятую или пробел."""
+    return [pattern for pattern in re.split(r"[,\s]+", text or "") if pattern]
+
+
+def _compile_pattern(pattern: str):
+    """Шаблон в функцию проверки имени: /regex/ — поиск, иначе glob целиком."""
+    if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+        return re.compile(pattern[1:-1]).search
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+class InterfaceFilter:
+    """Отбор интерфейсов по шаблонам include/exclude (glob или /regex/)."""
+    
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        """Инициализация (пустой include — все интерфейсы); ошибка в regex — re.error."""
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self._include = [_compile_pattern(pattern) for pattern in self.include]
+        self._exclude = [_compile_pattern(pattern) for pattern in self.exclude]
+        self._cache = {}
+    
+    def __call__(self, name: str) -> bool:
+        """Нужен ли интерфейс (результат запоминается по имени)."""
+        allowed = self._cache.get(name)
+        if allowed is None:
+            allowed = self._cache[name] = (
+                not self._include or any(match(name) for match in self._include)
+            ) and not any(match(name) for match in self._exclude)
+        return allowed
+
+
+class InterfaceCounters:
+    """Счётчики интерфейса; запись живёт между опросами и обновляется на месте."""
+    
+    __slots__ = ('name', 'changed') + NET_DEV_FIELDS
+    
+    def __init__(self, name: str):
+        """Инициализация."""
+        self.name = name
+        self.changed = True
+        for field in NET_DEV_FIELDS:
+            setattr(self, field, 0)
+    
+    def __getitem__(self, key: str) -> int:
+        """Счётчик по имени колонки."""
+        if key not in _NET_DEV_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        """Счётчик по имени колонки или default."""
+        return getattr(self, key) if key in _NET_DEV_KEYS else default
+    
+    def as_dict(self) -> Dict[str, int]:
+        """Копия счётчиков (для диагностики и сохранения)."""
+        return {field: getattr(self, field) for field in NET_DEV_FIELDS}
+    
+    def __repr__(self) -> str:
+        return f"InterfaceCounters({self.name!r}, {self.as_dict()})"
+
+
+class ArpEntry:
+    """Строка ARP-таблицы; запись живёт, пока MAC есть в таблице."""
+    
+    __slots__ = ('changed',) + ARP_FIELDS
+    
+    def __init__(self, mac: str):
+        """Инициализация."""
+        self.mac = mac
+        self.ip = None
+        self.flags = 0
+        self.interface = None
+        self.changed = True
+    
+    def __getitem__(self, key: str):
+        """Поле по имени."""
+        if key not in _ARP_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        """Поле по имени или default."""
+        return getattr(self, key) if key in _ARP_KEYS else default
+    
+    def as_dict(self) -> Dict:
+        """Копия полей."""
+        return {field: getattr(self, field) for field in ARP_FIELDS}
+    
+    def __repr__(self) -> str:
+        return f"ArpEntry({self.as_dict()})"
+
+
+class NetDevTable:
+    """Разбор /proc/net/dev из байтов в постоянные записи интерфейсов."""
+    
+    def __init__(self, interface_filter: Optional[InterfaceFilter] = None):
+        """Инициализация (interface_filter — какие интерфейсы разбирать)."""
+        self._records = {}
+        self._lines = {}
+        self._filter = interface_filter
+        self._allowed = {}
+    
+    def settle(self):
+        """Отметить все записи неизменившимися (вывод совпал с прошлым)."""
+        for record in self._records.values():
+            record.changed = False
+    
+    def parse(self, buf: bytes) -> Dict[str, InterfaceCounters]:
+        """Обновить записи по выводу; вернуть интерфейсы этого снимка по имени."""
+        # Строка, совпавшая байт в байт с прошлой, сразу даёт запись — числа не разбираем
+        interfaces = {}
+        lines = {}
+        previous = self._lines
+        records = self._records
+        for line in buf.split(b'\n'):
+            record = previous.get(line)
+            if record is not None:
+                record.changed = False
+            else:
+                # В заголовках нет двоеточия; имя может быть слеплено со счётчиком ("eth0:123")
+                colon = line.find(b':')
+                if colon < 0:
+                    continue
+                # Отфильтрованные интерфейсы отсекаем по имени, до разбора чисел
+                raw_name = line[:colon].strip()
+                allowed = self._allowed.get(raw_name)
+                if allowed is None:
+                    name = raw_name.decode('utf-8', errors='ignore')
+                    allowed = self._allowed[raw_name] = (
+                        self._filter is None or self._filter(name)
+                    )
+                if not allowed:
+                    continue
+                values = line[colon + 1:].split()
+                if len(values) < len(NET_DEV_FIELDS):
+                    continue
+                name = raw_name.decode('utf-8', errors='ignore')
+                record = records.get(name)
+                if record is None:
+                    record = InterfaceCounters(name)
+                for field, value in zip(NET_DEV_FIELDS, values):
+                    setattr(record, field, int(value))
+                record.changed = True
+            interfaces[record.name] = record
+            lines[line] = record
+        
+        # Исчезнувшие интерфейсы забываем вместе с их строками
+        self._records = interfaces
+        self._lines = lines
+        return interfaces
+
+
+class ArpTable:
+    """Разбор /proc/net/arp из байтов в постоянные записи по MAC."""
+    
+    def __init__(self):
+        """Инициализация."""
+        self._records = {}
+        self._lines = {}
+    
+    def settle(self):
+        """Отметить все записи неизменившимися (вывод совпал с прошлым)."""
+        for record in self._records.values():
+            record.changed = False
+    
+    def parse(self, buf: bytes) -> List[ArpEntry]:
+        """Обновить записи по выводу; вернуть подключённые устройства."""
+        # Строка, совпавшая байт в байт с прошлой, сразу даёт запись — поля не разбираем
+        devices = {}
+        lines = {}
+        previous = self._lines
+        records = self._records
+        for line in buf.split(b'\n'):
+            record = previous.get(line)
+            if record is not None:
+                if record.mac in devices:
+                    continue
+                record.changed = False
+            else:
+                parts = line.split()
+                if len(parts) < 6 or parts[3] == _EMPTY_MAC or line.startswith(_ARP_HEADER):
+                    continue
+                mac = parts[3].decode('ascii', errors='ignore').lower()
+                # Один MAC на нескольких строках: оставляем первую
+                if mac in devices:
+                    continue
+                record = records.get(mac)
+                if record is None:
+                    record = ArpEntry(mac)
+                record.ip = parts[0].decode('ascii', errors='ignore')
+                record.flags = int(parts[2], 16)
+                record.interface = parts[5].decode('utf-8', errors='ignore')
+                record.changed = True
+            devices[record.mac] = record
+            lines[line] = record
+        
+        self._records = devices
+        self._lines = lines
+        return list(devices.values())
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""Counter-delta rates for D-Link Router: interface throughput, CPU usage and client traffic."""
+
+import math
+from typing import Dict, Optional, Tuple
+
+from .const import CLIENT_RANK_WINDOW
+
+# /proc/net/dev на старых ядрах MIPS отдаёт 32-битные счётчики
+COUNTER_32BIT = 2 ** 32
+
+# Скорости выше этих считаем невозможными (сброс счётчика, а не переполнение);
+# у маршрутизаторов D-Link порты не быстрее 1 Гбит/с
+MAX_BYTES_PER_SECOND = 1.25e8  # 1 Гбит/с
+MAX_PACKETS_PER_SECOND = 1.5e6  # 1 Гбит/с кадрами по 64 байта
+
+# Счётчик -> (имя скорости, множитель, предел)
+RATE_COUNTERS = {
+    'rx_bytes': ('rx_bps', 8, MAX_BYTES_PER_SECOND),
+    'tx_bytes': ('tx_bps', 8, MAX_BYTES_PER_SECOND),
+    'rx_packets': ('rx_pps', 1, MAX_PACKETS_PER_SECOND),
+    'tx_packets': ('tx_pps', 1, MAX_PACKETS_PER_SECOND),
+}
+
+
+def counter_delta(old: int, new: int, elapsed: float, max_rate: float) -> Optional[int]:
+    """Приращение счётчика с учётом переполнения; None — счётчик сброшен."""
+    if new >= old:
+        return new - old
+    
+    # Счётчик уменьшился: переполнение 32 бит или сброс (перезагрузка, сброс линка).
+    # Переполнение однозначно, только пока приращение заметно меньше 2**32: при редком
+    # опросе предел скорости сам по себе пропустил бы сброс как переполнение
+    if old < COUNTER_32BIT:
+        wrapped = new + COUNTER_32BIT - old
+        if wrapped <= max_rate * elapsed and wrapped < COUNTER_32BIT // 2:
+            return wrapped
+    return None
+
+
+class InterfaceRateCalculator:
+    """Скорости интерфейсов по приращениям счётчиков между опросами."""
+    
+    def __init__(self, smoothing: float = 0):
+        """Инициализация (smoothing — окно EWMA в секундах, 0 — без сглаживания)."""
+        self.smoothing = smoothing
+        self._samples = {}
+        self._rates = {}
+    
+    def reset(self):
+        """Забыть прошлые отсчёты (маршрутизатор перезагрузился)."""
+        self._samples.clear()
+        self._rates.clear()
+    
+    def update(self, interfaces: Dict[str, Dict], timestamp: float) -> Dict[str, Dict]:
+        """Учесть новый снимок счётчиков и вернуть скорости по интерфейсам."""
+        rates = {}
+        for iface, counters in interfaces.items():
+            previous = self._samples.get(iface)
+            self._samples[iface] = (timestamp, {key: counters[key] for key in RATE_COUNTERS})
+            if previous is None:
+                continue
+            
+            elapsed = timestamp - previous[0]
+            if elapsed <= 0:
+                if iface in self._rates:
+                    rates[iface] = self._rates[iface]
+                continue
+            
+            iface_rates = {}
+            for key, (rate_key, scale, max_rate) in RATE_COUNTERS.items():
+                delta = counter_delta(previous[1][key], counters[key], elapsed, max_rate)
+                if delta is None:
+                    continue
+                value = delta * scale / elapsed
+                
+                # EWMA: вес нового отсчёта зависит от прошедшего времени
+                last = self._rates.get(iface, {}).get(rate_key)
+                if self.smoothing > 0 and last is not None:
+                    alpha = 1 - math.exp(-elapsed / self.smoothing)
+                    value = last + alpha * (value - last)
+                iface_rates[rate_key] = round(value, 1)
+            
+            rates[iface] = iface_rates
+        
+        # Исчезнувшие интерфейсы больше не отслеживаем
+        for iface in self._samples.keys() - interfaces.keys():
+            del self._samples[iface]
+        
+        self._rates = rates
+        return rates
+
+
+class CpuUsageCalculator:
+    """Загрузка CPU в процентах по приращениям счётчиков /proc/stat между опросами."""
+    
+    def __init__(self):
+        """Инициализация."""
+        self._samples = {}
+    
+    def reset(self):
+        """Забыть прошлые отсчёты (маршрутизатор перезагрузился)."""
+        self._samples.clear()
+    
+    def update(self, times: Dict[str, Tuple[int, int]]) -> Dict[str, float]:
+        """Учесть счётчики (простой, всего) по строкам cpu*; вернуть занятость, %."""
+        usage = {}
+        for name, (idle, total) in times.items():
+            previous = self._samples.get(name)
+            if previous is None:
+                continue
+            idle_delta = idle - previous[0]
+            total_delta = total - previous[1]
+            # Счётчики уменьшились (перезагрузка) или время не шло — пропускаем отсчёт
+            if total_delta <= 0 or idle_delta < 0:
+                continue
+            usage[name] = round(100 * (total_delta - idle_delta) / total_delta, 1)
+        self._samples = dict(times)
+        return usage
+
+
+class ClientTrafficCalculator:
+    """Трафик клиентов по MAC из счётчиков соединений conntrack между опросами.
+    
+    Соединения живут недолго, поэтому суммы копятся у нас: каждый опрос добавляет
+    приращения счётчиков живых соединений. Сенсоры получают только top_n клиентов
+    с наибольшей сглаженной скоростью.
+    """
+    
+    def __init__(self, top_n: int, window: float = CLIENT_RANK_WINDOW):
+        """Инициализация (window — окно EWMA скорости для выбора клиентов, секунды)."""
+        self.top_n = top_n
+        self.window = window
+        self._flows = None
+        self._timestamp = None
+        
+        # MAC -> [отдано байт, получено байт, отдано пакетов, получено пакетов]
+        self._totals = {}
+        # MAC -> сглаженная скорость (бит/с), по ней выбираются самые активные
+        self._rank = {}
+        self._clients = {}
+    
+    def reset(self):
+        """Забыть счётчики соединений (маршрутизатор перезагрузился); суммы остаются."""
+        self._flows = None
+        self._timestamp = None
+    
+    def update(
+        self, flows: Dict[Tuple, Tuple], clients: Dict[bytes, str], timestamp: float
+    ) -> Dict[str, Dict]:
+        """Учесть снимок соединений (clients — IP клиента -> MAC); вернуть top_n клиентов."""
+        previous = self._flows
+        elapsed = timestamp - self._timestamp if self._timestamp is not None else 0
+        self._flows = flows
+        self._timestamp = timestamp
+        # Первый снимок — только точка отсчёта: накопленное до нас не считаем
+        if previous is None or elapsed <= 0:
+            return self._clients
+        
+        deltas = {}
+        for key, counters in flows.items():
+            # Клиент — источник соединения, либо отвечающий (проброс порта)
+            mac = clients.get(key[0])
+            reply = mac is None
+            if reply:
+                mac = clients.get(counters[0])
+                if mac is None:
+                    continue
+            
+            # Новое соединение (или счётчики сбросились) целиком появилось после прошлого снимка
+            packets, sent, reply_packets, received = counters[1:]
+            old = previous.get(key)
+            if old is not None and old[2] <= sent and old[4] <= received:
+                packets -= old[1]
+                sent -= old[2]
+                reply_packets -= old[3]
+                received -= old[4]
+            if not (sent or received):
+                continue
+            
+            total = deltas.setdefault(mac, [0, 0, 0, 0])
+            if reply:
+                total[0] += received
+                total[1] += sent
+                total[2] += reply_packets
+                total[3] += packets
+            else:
+                total[0] += sent
+                total[1] += received
+                total[2] += packets
+                total[3] += reply_packets
+        
+        # Ушедшие клиенты забываются, их скорость в рейтинге затухает сама
+        for mac in self._totals.keys() - clients.values():
+            self._totals.pop(mac)
+            self._rank.pop(mac, None)
+        alpha = 1 - math.exp(-elapsed / self.window)
+        for mac in self._rank.keys() | deltas.keys():
+            delta = deltas.get(mac)
+            rate = (delta[0] + delta[1]) * 8 / elapsed if delta else 0.0
+            last = self._rank.get(mac)
+            self._rank[mac] = rate if last is None else last + alpha * (rate - last)
+        for mac, delta in deltas.items():
+            totals = self._totals.setdefault(mac, [0, 0, 0, 0])
+            for i, value in enumerate(delta):
+                totals[i] += value
+        
+        ip_by_mac = {mac: ip.decode('ascii', errors='ignore') for ip, mac in clients.items()}
+        top = sorted(self._totals, key=lambda mac: self._rank.get(mac, 0), reverse=True)
+        result = {}
+        for mac in top[:self.top_n]:
+            upload, download, upload_packets, download_packets = self._totals[mac]
+            delta = deltas.get(mac, (0, 0))
+            result[mac] = {
+                'ip': ip_by_mac.get(mac),
+                'upload_rate': round(delta[0] * 8 / elapsed, 1),
+                'download_rate': round(delta[1] * 8 / elapsed, 1),
+                'upload': upload,
+                'download': download,
+                'upload_packets': upload_packets,
+                'download_packets': download_packets,
+            }
+        self._clients = result
+        return result
\ No newline at end of file
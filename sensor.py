@@ -8,17 +8,43 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import (
     PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
     UnitOfDataRate,
     UnitOfInformation,
     UnitOfTime,
 )
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers import entity_registry as er
 
 from .const import DOMAIN
+from .coordinator import CONTEXT_GROUPS_CHANGED, CONTEXT_TIMINGS
+from .entity import DLinkEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Ключи сенсоров групп, чей состав проходит фильтр интерфейсов
+# (уникальный ID — <запись>_<интерфейс>_<ключ>)
+GROUP_SENSOR_KEYS = {
+    "interfaces": (
+        "rx_bytes",
+        "tx_bytes",
+        "rx_errors",
+        "rx_dropped",
+        "tx_errors",
+        "tx_dropped",
+        "rx_bps",
+        "tx_bps",
+        "rx_pps",
+        "tx_pps",
+    ),
+    "wireless": (
+        "stations",
+        "signal",
+        "signal_min",
+    ),
+}
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Установка сенсоров."""
@@ -97,36 +123,273 @@ async def async_setup_entry(hass, entry, async_add_entities):
             None,
             SensorStateClass.MEASUREMENT,
         ),
+        
+        # CPU Usage (по /proc/stat)
+        DLinkSensor(
+            coordinator,
+            "cpu_usage",
+            "CPU Usage",
+            PERCENTAGE,
+            None,
+            SensorStateClass.MEASUREMENT,
+        ),
+        
+        # NAT (conntrack)
+        DLinkSensor(
+            coordinator,
+            "conntrack_count",
+            "NAT Connections",
+            "connections",
+            None,
+            SensorStateClass.MEASUREMENT,
+        ),
+        DLinkSensor(
+            coordinator,
+            "conntrack_percentage",
+            "NAT Table Usage",
+            PERCENTAGE,
+            None,
+            SensorStateClass.MEASUREMENT,
+        ),
+        
+        # Wi-Fi
+        DLinkSensor(
+            coordinator,
+            "wireless_stations",
+            "Wireless Stations",
+            "stations",
+            None,
+            SensorStateClass.MEASUREMENT,
+        ),
     ]
     
-    # Добавляем сенсоры для интерфейсов
-    if coordinator.data and "interfaces" in coordinator.data:
-        for iface_name in coordinator.data["interfaces"].keys():
-            # RX
+    # Сенсоры групп с переменным составом: интерфейсы (прошедшие фильтр), радио, ядра CPU
+    # и самые активные клиенты
+    _async_remove_filtered_interfaces(
+        hass, entry, coordinator.interface_filter, {sensor.unique_id for sensor in sensors}
+    )
+    factories = {
+        "interfaces": _interface_sensors,
+        "wireless": _wireless_sensors,
+        "cpu_cores": _cpu_core_sensors,
+        "clients": _client_sensors,
+    }
+    group_sensors = {group: {} for group in factories}
+    for group, factory in factories.items():
+        for name in (coordinator.data or {}).get(group, {}):
+            group_sensors[group][name] = factory(coordinator, name)
+            sensors.extend(group_sensors[group][name])
+    
+    # Длительность стадий опроса (диагностика)
+    for stage, statistic, name, enabled in (
+        ("poll", "p50_ms", "Poll Time p50", True),
+        ("poll", "p95_ms", "Poll Time p95", True),
+        ("poll", "max_ms", "Poll Time Max", True),
+        ("handshake", "p95_ms", "SSH Handshake Time p95", False),
+        ("command", "p95_ms", "Command Time p95", False),
+        ("parse", "p95_ms", "Parse Time p95", False),
+    ):
+        sensors.append(DLinkTimingSensor(coordinator, stage, statistic, name, enabled))
+    
+    async_add_entities(sensors)
+    
+    @callback
+    def async_sync_groups():
+        """Добавить сенсоры появившихся интерфейсов, радио, ядер и клиентов и убрать исчезнувших."""
+        for group, factory in factories.items():
+            current = (coordinator.data or {}).get(group, {})
+            known = group_sensors[group]
+            new = [name for name in current if name not in known]
+            for name in new:
+                known[name] = factory(coordinator, name)
+            if new:
+                async_add_entities(sensor for name in new for sensor in known[name])
+            
+            # Запись в реестре остаётся: вернувшийся интерфейс получит те же entity_id
+            for name in known.keys() - current.keys():
+                _LOGGER.debug("%s исчез (%s), его сенсоры убраны", name, group)
+                for sensor in known.pop(name):
+                    if sensor.hass is not None:
+                        hass.async_create_task(sensor.async_remove())
+    
+    entry.async_on_unload(
+        coordinator.async_add_listener(async_sync_groups, CONTEXT_GROUPS_CHANGED)
+    )
+
+
+@callback
+def _async_remove_filtered_interfaces(hass, entry, interface_filter, fixed_ids):
+    """Удалить из реестра сенсоры интерфейсов и радио, не прошедших фильтр.
+    
+    fixed_ids — уникальные ID постоянных сенсоров: wireless_stations маршрутизатора
+    иначе сошёл бы за сенсор stations радио с именем wireless.
+    """
+    prefix = f"{entry.entry_id}_"
+    registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity_entry.domain != "sensor" or not entity_entry.unique_id.startswith(prefix):
+            continue
+        if entity_entry.unique_id in fixed_ids:
+            continue
+        key = entity_entry.unique_id[len(prefix):]
+        iface_name = next(
+            (
+                key[:-len(data_key) - 1]
+                for keys in GROUP_SENSOR_KEYS.values()
+                for data_key in keys
+                if key.endswith(f"_{data_key}") and len(key) > len(data_key) + 1
+            ),
+            None,
+        )
+        if iface_name is not None and not interface_filter(iface_name):
+            _LOGGER.debug("Сенсор %s отфильтрован, удаляем", entity_entry.entity_id)
+            registry.async_remove(entity_entry.entity_id)
+
+
+def _interface_sensors(coordinator, iface_name):
+    """Сенсоры одного интерфейса: счётчики, ошибки и скорости."""
+    sensors = []
+    # RX
+    sensors.append(
+        DLinkInterfaceSensor(
+            coordinator,
+            iface_name,
+            "rx_bytes",
+            f"{iface_name} RX",
+            UnitOfInformation.BYTES,
+        )
+    )
+    # TX
+    sensors.append(
+        DLinkInterfaceSensor(
+            coordinator,
+            iface_name,
+            "tx_bytes",
+            f"{iface_name} TX",
+            UnitOfInformation.BYTES,
+        )
+    )
+    # Ошибки и отброшенные пакеты (по умолчанию выключены)
+    for direction in ("rx", "tx"):
+        for counter, label in (("errors", "Errors"), ("dropped", "Drops")):
             sensors.append(
                 DLinkInterfaceSensor(
                     coordinator,
                     iface_name,
-                    "rx_bytes",
-                    f"{iface_name} RX",
-                    UnitOfInformation.BYTES,
+                    f"{direction}_{counter}",
+                    f"{iface_name} {direction.upper()} {label}",
+                    None,
+                    enabled=False,
                 )
             )
-            # TX
-            sensors.append(
-                DLinkInterfaceSensor(
-                    coordinator,
-                    iface_name,
-                    "tx_bytes",
-                    f"{iface_name} TX",
-                    UnitOfInformation.BYTES,
-                )
+    # Скорости (считаются по приращениям счётчиков)
+    for direction in ("rx", "tx"):
+        sensors.append(
+            DLinkInterfaceSensor(
+                coordinator,
+                iface_name,
+                f"{direction}_bps",
+                f"{iface_name} {direction.upper()} Rate",
+                UnitOfDataRate.BITS_PER_SECOND,
+                group="rates",
+                device_class=SensorDeviceClass.DATA_RATE,
+                state_class=SensorStateClass.MEASUREMENT,
             )
-    
-    async_add_entities(sensors)
+        )
+        sensors.append(
+            DLinkInterfaceSensor(
+                coordinator,
+                iface_name,
+                f"{direction}_pps",
+                f"{iface_name} {direction.upper()} Packet Rate",
+                "packets/s",
+                group="rates",
+                state_class=SensorStateClass.MEASUREMENT,
+            )
+        )
+    return sensors
+
+
+def _wireless_sensors(coordinator, radio):
+    """Сенсоры радиоинтерфейса: число станций, средний и самый слабый сигнал."""
+    return [
+        DLinkInterfaceSensor(
+            coordinator,
+            radio,
+            "stations",
+            f"{radio} Stations",
+            "stations",
+            group="wireless",
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        DLinkInterfaceSensor(
+            coordinator,
+            radio,
+            "signal",
+            f"{radio} Signal",
+            SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+            group="wireless",
+            device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        DLinkInterfaceSensor(
+            coordinator,
+            radio,
+            "signal_min",
+            f"{radio} Weakest Signal",
+            SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+            group="wireless",
+            device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+            state_class=SensorStateClass.MEASUREMENT,
+            enabled=False,
+        ),
+    ]
 
 
-class DLinkSensor(CoordinatorEntity, SensorEntity):
+def _cpu_core_sensors(coordinator, core):
+    """Сенсор загрузки одного ядра CPU."""
+    return [
+        DLinkInterfaceSensor(
+            coordinator,
+            core,
+            "usage",
+            f"{core.upper()} Usage",
+            PERCENTAGE,
+            group="cpu_cores",
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+    ]
+
+
+def _client_sensors(coordinator, mac):
+    """Сенсоры клиента из самых активных: скорость и объём трафика в обе стороны."""
+    sensors = []
+    for direction, label in (("download", "Download"), ("upload", "Upload")):
+        sensors.append(
+            DLinkClientSensor(
+                coordinator,
+                mac,
+                f"{direction}_rate",
+                f"{mac} {label} Rate",
+                UnitOfDataRate.BITS_PER_SECOND,
+                device_class=SensorDeviceClass.DATA_RATE,
+                state_class=SensorStateClass.MEASUREMENT,
+            )
+        )
+        sensors.append(
+            DLinkClientSensor(
+                coordinator,
+                mac,
+                direction,
+                f"{mac} {label}",
+                UnitOfInformation.BYTES,
+                device_class=SensorDeviceClass.DATA_SIZE,
+            )
+        )
+    return sensors
+
+
+class DLinkSensor(DLinkEntity, SensorEntity):
     """Базовый сенсор D-Link Router."""
     
     def __init__(
@@ -139,10 +402,9 @@ class DLinkSensor(CoordinatorEntity, SensorEntity):
         state_class,
     ):
         """Инициализация сенсора."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, data_key, context=data_key)
         self._data_key = data_key
-        self._attr_name = f"D-Link {name}"
-        self._attr_unique_id = f"dlink_router_{data_key}"
+        self._attr_name = name
         self._attr_native_unit_of_measurement = unit
         self._attr_device_class = device_class
         self._attr_state_class = state_class
@@ -151,28 +413,87 @@ class DLinkSensor(CoordinatorEntity, SensorEntity):
     def native_value(self):
         """Значение сенсора."""
         if self.coordinator.data:
-            return self.coordinator.data.get(self._data_key)
+            return self.coordinator.entity_value(
+                self._data_key, self.coordinator.data.get(self._data_key)
+            )
         return None
 
 
-class DLinkInterfaceSensor(CoordinatorEntity, SensorEntity):
-    """Сенсор для интерфейса."""
+class DLinkInterfaceSensor(DLinkEntity, SensorEntity):
+    """Сенсор элемента группы: интерфейса (interfaces, rates), радио или ядра CPU."""
     
-    def __init__(self, coordinator, interface, data_key, name, unit):
+    def __init__(
+        self,
+        coordinator,
+        interface,
+        data_key,
+        name,
+        unit,
+        group="interfaces",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        enabled=True,
+    ):
         """Инициализация."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, f"{interface}_{data_key}", context=(group, interface))
         self._interface = interface
         self._data_key = data_key
-        self._attr_name = f"D-Link {name}"
-        self._attr_unique_id = f"dlink_router_{interface}_{data_key}"
+        self._group = group
+        self._attr_name = name
         self._attr_native_unit_of_measurement = unit
-        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+        self._attr_entity_registry_enabled_default = enabled
     
     @property
     def native_value(self):
         """Значение сенсора."""
-        if self.coordinator.data and "interfaces" in self.coordinator.data:
-            interfaces = self.coordinator.data["interfaces"]
+        if self.coordinator.data and self._group in self.coordinator.data:
+            interfaces = self.coordinator.data[self._group]
             if self._interface in interfaces:
-                return interfaces[self._interface].get(self._data_key)
-        return None
\ No newline at end of file
+                value = interfaces[self._interface].get(self._data_key)
+                if self._group == "rates":
+                    return self.coordinator.entity_value(
+                        f"{self._interface}.{self._data_key}", value
+                    )
+                return value
+        return None
+
+
+class DLinkClientSensor(DLinkInterfaceSensor):
+    """Сенсор трафика клиента (по MAC); текущий IP — в атрибутах."""
+    
+    def __init__(self, coordinator, mac, data_key, name, unit, **kwargs):
+        """Инициализация."""
+        super().__init__(coordinator, mac, data_key, name, unit, group="clients", **kwargs)
+    
+    @property
+    def extra_state_attributes(self):
+        """IP клиента из таблицы ARP."""
+        client = (self.coordinator.data or {}).get("clients", {}).get(self._interface)
+        return {"ip": client.get("ip")} if client else None
+
+
+class DLinkTimingSensor(DLinkEntity, SensorEntity):
+    """Диагностический сенсор длительности стадии опроса."""
+    
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    
+    def __init__(self, coordinator, stage, statistic, name, enabled):
+        """Инициализация."""
+        super().__init__(coordinator, f"timing_{stage}_{statistic}", context=CONTEXT_TIMINGS)
+        self._stage = stage
+        self._statistic = statistic
+        self._attr_name = name
+        self._attr_entity_registry_enabled_default = enabled
+    
+    @property
+    def native_value(self):
+        """Значение из скользящего окна замеров."""
+        stats = self.coordinator.api.timings.stages.get(self._stage)
+        if stats is None:
+            return None
+        return stats.summary().get(self._statistic)
\ No newline at end of file
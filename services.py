@@ -0,0 +1,152 @@
+"""Services for D-Link Router."""
+
+import asyncio
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import Unauthorized, UnknownUser
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DATA_FLEET,
+    RESOLUTIONS,
+    RESOLUTION_RAW,
+    SECTION_INTERVALS,
+    SERVICE_GET_HISTORY,
+    SERVICE_REFRESH,
+    SERVICE_RUN_COMMAND,
+    EVENT_COMMAND_RESULT,
+    SSH_TIMEOUT,
+    EXEC_MAX_TIMEOUT,
+)
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_METRIC = "metric"
+ATTR_RESOLUTION = "resolution"
+ATTR_SINCE = "since"
+ATTR_SECTIONS = "sections"
+ATTR_COMMANDS = "commands"
+ATTR_TIMEOUT = "timeout"
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_METRIC): cv.string,
+        vol.Optional(ATTR_RESOLUTION, default=RESOLUTION_RAW): vol.In(RESOLUTIONS),
+        vol.Optional(ATTR_SINCE): cv.datetime,
+    }
+)
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SECTIONS): vol.All(cv.ensure_list, [vol.In(list(SECTION_INTERVALS))]),
+    }
+)
+
+RUN_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_COMMANDS): vol.All(cv.ensure_list, [cv.string], vol.Length(min=1)),
+        vol.Optional(ATTR_TIMEOUT, default=SSH_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=EXEC_MAX_TIMEOUT)
+        ),
+    }
+)
+
+
+def _coordinators(hass: HomeAssistant, entry_id=None):
+    """Координаторы загруженных записей (или одной указанной)."""
+    for key, data in hass.data.get(DOMAIN, {}).items():
+        if key == DATA_FLEET or (entry_id is not None and key != entry_id):
+            continue
+        yield key, data["coordinator"]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Зарегистрировать сервисы интеграции."""
+    
+    async def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """История метрик: сырые отсчёты или агрегаты за 1 мин / 1 ч."""
+        since = call.data.get(ATTR_SINCE)
+        timestamp = dt_util.as_timestamp(since) if since else 0
+        return {
+            entry_id: coordinator.history.query(
+                call.data.get(ATTR_METRIC), call.data[ATTR_RESOLUTION], timestamp
+            )
+            for entry_id, coordinator in _coordinators(hass, call.data.get(ATTR_ENTRY_ID))
+        }
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    
+    async def async_refresh(call: ServiceCall) -> None:
+        """Внеочередное обновление групп метрик (одновременные вызовы — один опрос)."""
+        sections = call.data.get(ATTR_SECTIONS)
+        await asyncio.gather(
+            *(
+                coordinator.async_request_sections(set(sections) if sections else None)
+                for _, coordinator in _coordinators(hass, call.data.get(ATTR_ENTRY_ID))
+            )
+        )
+    
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA)
+    
+    async def async_run_command(call: ServiceCall) -> ServiceResponse:
+        """Выполнить команды на маршрутизаторе; итог каждой — событием, как только готов."""
+        # Произвольная команда в оболочке маршрутизатора — только для администраторов
+        if call.context.user_id:
+            user = await hass.auth.async_get_user(call.context.user_id)
+            if user is None:
+                raise UnknownUser(context=call.context, user_id=call.context.user_id)
+            if not user.is_admin:
+                raise Unauthorized(context=call.context)
+        
+        async def run(entry_id, coordinator):
+            results = []
+            async for result in coordinator.api.async_execute_many(
+                call.data[ATTR_COMMANDS], call.data[ATTR_TIMEOUT]
+            ):
+                hass.bus.async_fire(
+                    EVENT_COMMAND_RESULT,
+                    {
+                        "entry_id": entry_id,
+                        "host": coordinator.api.host,
+                        "index": result.index,
+                        **result.as_dict(),
+                    },
+                    context=call.context,
+                )
+                results.append(result)
+            return entry_id, [result.as_dict() for result in sorted(results, key=lambda r: r.index)]
+        
+        return dict(
+            await asyncio.gather(
+                *(
+                    run(entry_id, coordinator)
+                    for entry_id, coordinator in _coordinators(hass, call.data.get(ATTR_ENTRY_ID))
+                )
+            )
+        )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RUN_COMMAND,
+        async_run_command,
+        schema=RUN_COMMAND_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
\ No newline at end of file
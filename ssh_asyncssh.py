@@ -0,0 +1,241 @@
+"""SSH transport for D-Link Router via asyncssh (native asyncio)."""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import asyncssh
+
+from .const import (
+    SSH_TIMEOUT,
+    SSH_KEEPALIVE_INTERVAL,
+    COMMAND_MODE_SHELL,
+)
+from .transport import SHELL_INIT, BaseTransport, ShellFraming
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncSSHStream:
+    """Вывод долгой команды asyncssh."""
+    
+    def __init__(self, process):
+        """Инициализация."""
+        self._process = process
+    
+    async def read(self) -> bytes:
+        """Следующая порция вывода; b"" — команда завершилась."""
+        return await self._process.stdout.read(65536)
+    
+    def close(self):
+        """Закрыть канал."""
+        self._process.close()
+
+
+class AsyncSSHTransport(BaseTransport):
+    """Нативный asyncio SSH (asyncssh): не занимает потоки Home Assistant."""
+    
+    def __init__(self, *args, **kwargs):
+        """Инициализация."""
+        super().__init__(*args, **kwargs)
+        self._conn = None
+        self._lock = asyncio.Lock()
+        
+        # Постоянная интерактивная оболочка (режим shell)
+        self._shell = None
+        self._framing = None
+        self._shell_lock = asyncio.Lock()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Жива ли текущая SSH-сессия."""
+        return self._conn is not None and not self._conn.is_closed()
+    
+    async def async_connect(self) -> bool:
+        """Подключиться по SSH (или переиспользовать живую сессию)."""
+        async with self._lock:
+            if self.is_connected:
+                self.sessions_reused += 1
+                return True
+            
+            if not self._may_attempt():
+                return False
+            
+            await self._async_close_conn()
+            try:
+                with self.timings.measure("handshake"):
+                    self._conn = await asyncio.wait_for(
+                        asyncssh.connect(
+                            self.host,
+                            port=self.port,
+                            username=self.username,
+                            password=self.password,
+                            known_hosts=None,
+                            client_keys=None,
+                            agent_path=None,
+                            keepalive_interval=SSH_KEEPALIVE_INTERVAL,
+                        ),
+                        timeout=SSH_TIMEOUT,
+                    )
+                self._connected()
+                return True
+            except Exception as err:
+                self._connect_failed(err)
+                return False
+    
+    async def _async_close_conn(self):
+        """Закрыть соединение, не трогая паузу переподключения."""
+        self._close_shell()
+        if self._conn is not None:
+            self._conn.close()
+            try:
+                await self._conn.wait_closed()
+            except Exception:
+                pass
+            self._conn = None
+    
+    async def async_close(self):
+        """Отключиться."""
+        async with self._lock:
+            await self._async_close_conn()
+    
+    def _close_shell(self):
+        """Закрыть оболочку; следующий вызов откроет новую (ресинхронизация)."""
+        if self._shell is not None:
+            self._shell.close()
+            self._shell = None
+            self._framing = None
+    
+    async def _async_shell_exchange(
+        self, commands: List[str], timeout: float, raw: bool = False
+    ) -> List:
+        """Записать команды в оболочку и прочитать ответы по маркерам."""
+        async with self._shell_lock:
+            if self._shell is None or self._shell.channel.is_closing():
+                self._close_shell()
+                self._shell = await asyncio.wait_for(
+                    self._conn.create_process(encoding=None), timeout=timeout
+                )
+                self._shell.stdin.write(SHELL_INIT)
+                self._framing = ShellFraming()
+            
+            process = self._shell
+            framing = self._framing
+            payload, tokens = framing.script(commands)
+            process.stdin.write(payload)
+            
+            results = []
+            deadline = time.monotonic() + timeout
+            for token in tokens:
+                output = framing.pop(token, raw)
+                while output is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError("Нет ответа от оболочки")
+                    chunk = await asyncio.wait_for(process.stdout.read(65536), remaining)
+                    if not chunk:
+                        raise EOFError("Оболочка завершилась")
+                    framing.feed(chunk)
+                    output = framing.pop(token, raw)
+                results.append(output)
+            return results
+    
+    async def async_run_pipelined(
+        self, commands: List[str], timeout: float = SSH_TIMEOUT, raw: bool = False
+    ) -> List:
+        """Выполнить команды в постоянной оболочке одной записью."""
+        if self.command_mode != COMMAND_MODE_SHELL:
+            return await super().async_run_pipelined(commands, timeout, raw)
+        
+        for attempt in range(2):
+            if not await self.async_connect():
+                raise ConnectionError("Не удалось подключиться")
+            
+            try:
+                return await self._async_shell_exchange(commands, timeout, raw)
+            except asyncio.TimeoutError:
+                # Команда зависла: оболочку перезапускаем, но команду не повторяем
+                _LOGGER.warning("Оболочка на %s не ответила, перезапускаем её", self.host)
+                self._close_shell()
+                raise
+            except (asyncssh.Error, EOFError, OSError) as err:
+                self._close_shell()
+                if attempt == 0:
+                    _LOGGER.debug("Оболочка на %s закрылась (%s), открываем заново", self.host, err)
+                    if not self.is_connected:
+                        await self.async_close()
+                    continue
+                _LOGGER.error("Ошибка выполнения команд в оболочке: %s", err)
+                raise
+    
+    async def async_run(self, command: str, timeout: float = SSH_TIMEOUT, raw: bool = False):
+        """Выполнить команду."""
+        if self.command_mode == COMMAND_MODE_SHELL:
+            return (await self.async_run_pipelined([command], timeout, raw))[0]
+        
+        for attempt in range(2):
+            if not await self.async_connect():
+                raise ConnectionError("Не удалось подключиться")
+            
+            try:
+                result = await asyncio.wait_for(
+                    self._conn.run(command, check=False, encoding=None),
+                    timeout=timeout,
+                )
+            except (asyncssh.Error, OSError) as err:
+                if attempt == 0 and not self.is_connected:
+                    _LOGGER.debug("Сессия SSH к %s оборвалась, переподключаемся", self.host)
+                    await self.async_close()
+                    continue
+                _LOGGER.error("Ошибка выполнения команды '%s': %s", command, err)
+                raise
+            
+            output = result.stdout or b""
+            error = (result.stderr or b"").decode('utf-8', errors='ignore').strip()
+            if error and not output.strip():
+                _LOGGER.warning("Команда '%s' вернула ошибку: %s", command, error)
+            if raw:
+                return output
+            return output.decode('utf-8', errors='ignore').strip()
+    
+    @property
+    def multiplexed(self) -> bool:
+        """Отдельные каналы на команды — только в режиме exec."""
+        return self.command_mode != COMMAND_MODE_SHELL
+    
+    async def _async_exec(
+        self, command: str, timeout: float
+    ) -> Tuple[Optional[int], bytes, bytes]:
+        """Выполнить команду в своём канале: код выхода, stdout и stderr."""
+        if not self.multiplexed:
+            return await super()._async_exec(command, timeout)
+        
+        for attempt in range(2):
+            if not await self.async_connect():
+                raise ConnectionError("Не удалось подключиться")
+            
+            try:
+                # stdin закрыт сразу: читающая его команда не ждёт таймаута
+                result = await asyncio.wait_for(
+                    self._conn.run(command, check=False, encoding=None, stdin=asyncssh.DEVNULL),
+                    timeout=timeout,
+                )
+            except (asyncssh.Error, OSError) as err:
+                if attempt == 0 and not self.is_connected:
+                    _LOGGER.debug(
+                        "Сессия SSH к %s оборвалась (%s), переподключаемся", self.host, err
+                    )
+                    await self.async_close()
+                    continue
+                raise
+            return result.exit_status, result.stdout or b"", result.stderr or b""
+    
+    async def async_open_stream(self, command: str) -> AsyncSSHStream:
+        """Запустить долгую команду в отдельном канале той же сессии."""
+        if not await self.async_connect():
+            raise ConnectionError("Не удалось подключиться")
+        process = await asyncio.wait_for(
+            self._conn.create_process(command, encoding=None), timeout=SSH_TIMEOUT
+        )
+        return AsyncSSHStream(process)
\ No newline at end of file
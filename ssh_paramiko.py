@@ -0,0 +1,327 @@
+"""SSH transport for D-Link Router via paramiko."""
+
+import asyncio
+import logging
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import paramiko
+
+from .const import (
+    SSH_TIMEOUT,
+    SSH_KEEPALIVE_INTERVAL,
+    COMMAND_MODE_SHELL,
+)
+from .transport import SHELL_INIT, BaseTransport, ShellFraming
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ParamikoStream:
+    """Вывод долгой команды paramiko, читаемый из цикла событий без потоков."""
+    
+    def __init__(self, channel):
+        """Инициализация."""
+        self._channel = channel
+    
+    async def read(self) -> bytes:
+        """Следующая порция вывода; b"" — команда завершилась."""
+        # Канал paramiko отдаёт дескриптор, готовый к чтению при поступлении данных
+        channel = self._channel
+        while not (channel.recv_ready() or channel.eof_received or channel.closed):
+            loop = asyncio.get_running_loop()
+            ready = loop.create_future()
+            loop.add_reader(channel.fileno(), ready.set_result, None)
+            try:
+                await ready
+            finally:
+                loop.remove_reader(channel.fileno())
+        if channel.closed and not channel.recv_ready():
+            return b""
+        return channel.recv(65536)
+    
+    def close(self):
+        """Закрыть канал (цикл на маршрутизаторе получит SIGHUP)."""
+        self._channel.close()
+
+
+class ParamikoTransport(BaseTransport):
+    """Блокирующий paramiko: вызовы уходят в пул потоков."""
+    
+    def __init__(self, *args, **kwargs):
+        """Инициализация."""
+        super().__init__(*args, **kwargs)
+        self.ssh_client = None
+        self._lock = threading.RLock()
+        
+        # Постоянная интерактивная оболочка (режим shell)
+        self._shell = None
+        self._framing = None
+        self._shell_lock = threading.Lock()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Жива ли текущая SSH-сессия."""
+        if not self.ssh_client:
+            return False
+        transport = self.ssh_client.get_transport()
+        return transport is not None and transport.is_active()
+    
+    def connect(self) -> bool:
+        """Подключиться по SSH (или переиспользовать живую сессию)."""
+        with self._lock:
+            if self.is_connected:
+                self.sessions_reused += 1
+                return True
+            
+            # После неудачи не стучимся в маршрутизатор до конца паузы
+            if not self._may_attempt():
+                return False
+            
+            self._close_client()
+            try:
+                client = paramiko.SSHClient()
+                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                with self.timings.measure("handshake"):
+                    client.connect(
+                        self.host,
+                        port=self.port,
+                        username=self.username,
+                        password=self.password,
+                        timeout=SSH_TIMEOUT,
+                        look_for_keys=False,
+                        allow_agent=False,
+                    )
+                client.get_transport().set_keepalive(SSH_KEEPALIVE_INTERVAL)
+                self.ssh_client = client
+                self._connected()
+                return True
+            except Exception as err:
+                self._connect_failed(err)
+                return False
+    
+    def _close_client(self):
+        """Закрыть SSH-клиент, не трогая паузу переподключения."""
+        self._close_shell()
+        if self.ssh_client:
+            try:
+                self.ssh_client.close()
+            except Exception:
+                pass
+            self.ssh_client = None
+    
+    def close(self):
+        """Отключиться."""
+        with self._lock:
+            self._close_client()
+    
+    def _close_shell(self):
+        """Закрыть оболочку; следующий вызов откроет новую (ресинхронизация)."""
+        if self._shell is not None:
+            try:
+                self._shell.close()
+            except Exception:
+                pass
+            self._shell = None
+            self._framing = None
+    
+    def _shell_exchange(
+        self, client, commands: List[str], timeout: float, raw: bool = False
+    ) -> List:
+        """Записать команды в оболочку и прочитать ответы по маркерам."""
+        with self._shell_lock:
+            if self._shell is None or self._shell.closed:
+                self._close_shell()
+                channel = client.get_transport().open_session(timeout=timeout)
+                channel.invoke_shell()
+                channel.sendall(SHELL_INIT)
+                self._shell = channel
+                self._framing = ShellFraming()
+            
+            channel = self._shell
+            framing = self._framing
+            payload, tokens = framing.script(commands)
+            channel.sendall(payload)
+            
+            results = []
+            deadline = time.monotonic() + timeout
+            for token in tokens:
+                output = framing.pop(token, raw)
+                while output is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout("Нет ответа от оболочки")
+                    channel.settimeout(remaining)
+                    chunk = channel.recv(65536)
+                    if not chunk:
+                        raise EOFError("Оболочка завершилась")
+                    framing.feed(chunk)
+                    output = framing.pop(token, raw)
+                results.append(output)
+            return results
+    
+    def run_pipelined(
+        self, commands: List[str], timeout: float = SSH_TIMEOUT, raw: bool = False
+    ) -> List:
+        """Выполнить команды в постоянной оболочке одной записью."""
+        if self.command_mode != COMMAND_MODE_SHELL:
+            return [self.run(command, timeout, raw) for command in commands]
+        
+        for attempt in range(2):
+            with self._lock:
+                if not self.connect():
+                    raise ConnectionError("Не удалось подключиться")
+                client = self.ssh_client
+            
+            try:
+                return self._shell_exchange(client, commands, timeout, raw)
+            except socket.timeout:
+                # Команда зависла: оболочку перезапускаем, но команду не повторяем
+                _LOGGER.warning("Оболочка на %s не ответила, перезапускаем её", self.host)
+                self._close_shell()
+                raise
+            except (paramiko.SSHException, EOFError, socket.error) as err:
+                self._close_shell()
+                if attempt == 0:
+                    _LOGGER.debug("Оболочка на %s закрылась (%s), открываем заново", self.host, err)
+                    if not self.is_connected:
+                        self.close()
+                    continue
+                _LOGGER.error("Ошибка выполнения команд в оболочке: %s", err)
+                raise
+    
+    def run(self, command: str, timeout: float = SSH_TIMEOUT, raw: bool = False):
+        """Выполнить команду."""
+        if self.command_mode == COMMAND_MODE_SHELL:
+            return self.run_pipelined([command], timeout, raw)[0]
+        
+        # Одна повторная попытка: сессия могла умереть между опросами
+        for attempt in range(2):
+            with self._lock:
+                if not self.connect():
+                    raise ConnectionError("Не удалось подключиться")
+                client = self.ssh_client
+            
+            try:
+                stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+                output = stdout.read()
+                error = stderr.read().decode('utf-8', errors='ignore').strip()
+                
+                if error and not output.strip():
+                    _LOGGER.warning("Команда '%s' вернула ошибку: %s", command, error)
+                
+                if raw:
+                    return output
+                return output.decode('utf-8', errors='ignore').strip()
+            except (paramiko.SSHException, EOFError, socket.error) as err:
+                if attempt == 0 and not self.is_connected:
+                    _LOGGER.debug("Сессия SSH к %s оборвалась, переподключаемся", self.host)
+                    self.close()
+                    continue
+                _LOGGER.error("Ошибка выполнения команды '%s': %s", command, err)
+                raise
+            except Exception as err:
+                _LOGGER.error("Ошибка выполнения команды '%s': %s", command, err)
+                raise
+    
+    @property
+    def multiplexed(self) -> bool:
+        """Отдельные каналы на команды — только в режиме exec."""
+        return self.command_mode != COMMAND_MODE_SHELL
+    
+    @staticmethod
+    def _recv_until_eof(recv, channel, deadline: float) -> bytes:
+        """Дочитать stdout или stderr канала до конца, не дольше общего срока."""
+        data = bytearray()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("Команда не завершилась вовремя")
+            channel.settimeout(remaining)
+            chunk = recv(65536)
+            if not chunk:
+                return bytes(data)
+            data += chunk
+    
+    def execute(self, command: str, timeout: float) -> Tuple[Optional[int], bytes, bytes]:
+        """Выполнить команду в своём канале: код выхода, stdout и stderr."""
+        for attempt in range(2):
+            with self._lock:
+                if not self.connect():
+                    raise ConnectionError("Не удалось подключиться")
+                client = self.ssh_client
+            
+            try:
+                channel = client.get_transport().open_session(timeout=timeout)
+            except (paramiko.SSHException, EOFError, socket.error) as err:
+                if attempt == 0 and not self.is_connected:
+                    _LOGGER.debug(
+                        "Сессия SSH к %s оборвалась (%s), переподключаемся", self.host, err
+                    )
+                    self.close()
+                    continue
+                raise
+            
+            try:
+                deadline = time.monotonic() + timeout
+                channel.exec_command(command)
+                # stdin закрыт сразу: читающая его команда не ждёт таймаута
+                channel.shutdown_write()
+                stdout = self._recv_until_eof(channel.recv, channel, deadline)
+                stderr = self._recv_until_eof(channel.recv_stderr, channel, deadline)
+                if not channel.status_event.wait(max(deadline - time.monotonic(), 0)):
+                    raise socket.timeout("Нет кода выхода")
+                return channel.exit_status, stdout, stderr
+            finally:
+                channel.close()
+    
+    async def _async_exec(
+        self, command: str, timeout: float
+    ) -> Tuple[Optional[int], bytes, bytes]:
+        """Выполнить команду в пуле потоков (в режиме оболочки — в общей оболочке)."""
+        if not self.multiplexed:
+            return await super()._async_exec(command, timeout)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.execute, command, timeout
+        )
+    
+    async def async_connect(self) -> bool:
+        """Подключиться в пуле потоков."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.connect)
+    
+    async def async_close(self):
+        """Отключиться в пуле потоков."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+    
+    async def async_run(self, command: str, timeout: float = SSH_TIMEOUT, raw: bool = False):
+        """Выполнить команду в пуле потоков."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.run, command, timeout, raw
+        )
+    
+    async def async_run_pipelined(
+        self, commands: List[str], timeout: float = SSH_TIMEOUT, raw: bool = False
+    ) -> List:
+        """Выполнить команды в пуле потоков одним заданием."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.run_pipelined, commands, timeout, raw
+        )
+    
+    def _open_stream_channel(self, command: str):
+        """Открыть канал с долгой командой в той же сессии."""
+        with self._lock:
+            if not self.connect():
+                raise ConnectionError("Не удалось подключиться")
+            client = self.ssh_client
+        channel = client.get_transport().open_session(timeout=SSH_TIMEOUT)
+        channel.exec_command(command)
+        return channel
+    
+    async def async_open_stream(self, command: str) -> ParamikoStream:
+        """Запустить долгую команду; открытие канала — в пуле потоков, чтение — без."""
+        channel = await asyncio.get_running_loop().run_in_executor(
+            None, self._open_stream_channel, command
+        )
+        return ParamikoStream(channel)
\ No newline at end of file
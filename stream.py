@@ -0,0 +1,123 @@
+"""Router-side streaming collector for D-Link Router."""
+
+import asyncio
+import logging
+import math
+import random
+
+from .api import STREAM_END_MARKER, build_stream_command
+from .const import (
+    RECONNECT_BACKOFF_MIN,
+    RECONNECT_BACKOFF_MAX,
+    STREAM_STALL_FACTOR,
+    STREAM_STALL_TIMEOUT_MIN,
+    STREAM_REALTIME_SECTIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_STREAM_END = f"{STREAM_END_MARKER}\n".encode()
+
+
+class DLinkStreamCollector:
+    """Цикл на маршрутизаторе присылает снимки сам; при зависании — снова опрос."""
+    
+    def __init__(self, coordinator, interval: float):
+        """Инициализация (interval — период снимков, секунды)."""
+        self.coordinator = coordinator
+        self.api = coordinator.api
+        self.interval = interval
+        self.stall_timeout = max(interval * STREAM_STALL_FACTOR, STREAM_STALL_TIMEOUT_MIN)
+        
+        # Трафик — в каждом снимке, остальные группы — с тем же периодом, что и при опросе
+        every = {
+            section: 1
+            if section in STREAM_REALTIME_SECTIONS
+            else max(1, math.floor(seconds / interval))
+            for section, seconds in coordinator.section_intervals.items()
+        }
+        self.command = build_stream_command(interval, every)
+        
+        self.snapshots = 0
+        self.fallbacks = 0
+        self.active = False
+        self._task = None
+        self._stream = None
+    
+    def start(self):
+        """Запустить сбор в фоне."""
+        self._task = self.coordinator.hass.async_create_background_task(
+            self._async_run(), f"{self.coordinator.name} stream"
+        )
+    
+    async def async_stop(self):
+        """Остановить сбор и закрыть канал."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._close_stream()
+    
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+    
+    async def _async_run(self):
+        """Держать поток открытым; между попытками — экспоненциальная пауза."""
+        backoff = 0
+        while True:
+            received = self.snapshots
+            try:
+                await self._async_consume()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                _LOGGER.warning(
+                    "Поток данных с %s прервался (%s), переходим на опрос",
+                    self.api.host,
+                    err,
+                )
+            finally:
+                self._close_stream()
+            
+            if self.active:
+                self.active = False
+                self.fallbacks += 1
+                self.coordinator.async_stream_stalled()
+            
+            # Поток успел поработать — начинаем паузы заново
+            if self.snapshots > received:
+                backoff = 0
+            backoff = min(max(backoff * 2, RECONNECT_BACKOFF_MIN), RECONNECT_BACKOFF_MAX)
+            await asyncio.sleep(backoff * random.uniform(0.8, 1.2))
+    
+    async def _async_consume(self):
+        """Читать поток и передавать координатору каждый полный снимок."""
+        self._stream = await self.api.transport.async_open_stream(self.command)
+        _LOGGER.debug("Поток данных с %s запущен: %s", self.api.host, self.command)
+        
+        buffer = bytearray()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self._stream.read(), self.stall_timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"нет снимков {self.stall_timeout:g} с") from None
+            if not chunk:
+                raise EOFError("цикл на маршрутизаторе завершился")
+            buffer += chunk
+            
+            end = buffer.find(_STREAM_END)
+            while end >= 0:
+                snapshot = bytes(buffer[:end])
+                del buffer[:end + len(_STREAM_END)]
+                self.snapshots += 1
+                self.active = True
+                self.coordinator.async_handle_snapshot(self.api.split_sections(snapshot))
+                end = buffer.find(_STREAM_END)
\ No newline at end of file
@@ -3,9 +3,9 @@
 import logging
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .entity import DLinkEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,15 +24,14 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(switches)
 
 
-class DLinkRebootSwitch(CoordinatorEntity, SwitchEntity):
+class DLinkRebootSwitch(DLinkEntity, SwitchEntity):
     """Переключатель для перезагрузки маршрутизатора."""
     
     def __init__(self, coordinator, api):
         """Инициализация."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, "reboot")
         self._api = api
-        self._attr_name = "D-Link Router Reboot"
-        self._attr_unique_id = "dlink_router_reboot"
+        self._attr_name = "Reboot"
         self._attr_icon = "mdi:restart"
         self._is_on = False
     
@@ -44,7 +43,8 @@ class DLinkRebootSwitch(CoordinatorEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Перезагрузить маршрутизатор."""
         _LOGGER.warning("Перезагрузка маршрутизатора")
-        await self.hass.async_add_executor_job(self._api.reboot)
+        # В общей очереди команд: не перебивает другие команды записи
+        await self.coordinator.writes.async_submit(self._api.async_reboot)
         
     async def async_turn_off(self, **kwargs):
         """Ничего не делать."""
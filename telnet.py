@@ -0,0 +1,303 @@
+"""Telnet transport for D-Link Router."""
+
+import asyncio
+import logging
+import time
+from typing import List
+
+from .const import SSH_TIMEOUT
+from .transport import BaseTransport, ShellFraming
+
+_LOGGER = logging.getLogger(__name__)
+
+# Команды протокола telnet (RFC 854)
+_IAC = 255
+_DONT = 254
+_DO = 253
+_WONT = 252
+_WILL = 251
+_SB = 250
+_SE = 240
+
+# Опции, которые принимаем от сервера: эхо и подавление go-ahead
+_OPT_ECHO = 1
+_OPT_SGA = 3
+_ACCEPTED = (_OPT_ECHO, _OPT_SGA)
+
+_LOGIN_PROMPTS = (b"ogin:", b"sername:")
+_PASSWORD_PROMPT = b"assword:"
+_LOGIN_FAILED = (b"incorrect", b"failed", b"denied")
+
+# Маркеры готовности оболочки и проверки эха (в командах разбиты кавычками)
+_READY = b"@@dlink-ready"
+_ECHO_CHECK = b"@@dlink-echo"
+
+# Эхо и приглашения мешают разбору вывода: выключаем их сразу после входа
+_SHELL_SETUP = (
+    b"stty -echo 2>/dev/null; PS1=''; PS2=''; export PS1 PS2; exec 2>/dev/null; "
+    b"echo '@@dlink-''ready'\n"
+)
+
+
+class TelnetChannel:
+    """Соединение telnet: согласование опций и вывод без служебных байтов."""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Инициализация."""
+        self._reader = reader
+        self._writer = writer
+        self._pending = b""
+        self._unread = b""
+        
+        # Эхо не выключилось (нет stty): введённое приходит обратно перед выводом
+        self.echo = False
+    
+    @property
+    def closed(self) -> bool:
+        """Закрыто ли соединение."""
+        return self._writer.is_closing() or self._reader.at_eof()
+    
+    def write(self, data: bytes):
+        """Записать данные (переводы строк — как CR LF по правилам NVT)."""
+        self._writer.write(data.replace(b"\n", b"\r\n"))
+    
+    async def read(self) -> bytes:
+        """Следующая порция вывода без команд telnet; b"" — соединение закрыто."""
+        if self._unread:
+            data, self._unread = self._unread, b""
+            return data
+        while True:
+            chunk = await self._reader.read(65536)
+            if not chunk:
+                return b""
+            data = self._filter(self._pending + chunk)
+            if data:
+                return data
+    
+    def unread(self, data: bytes):
+        """Вернуть прочитанное: следующий read() отдаст это первым."""
+        self._unread = data + self._unread
+    
+    def _filter(self, data: bytes) -> bytes:
+        """Убрать команды IAC, ответить на согласование опций, CR LF -> LF."""
+        if _IAC not in data:
+            self._pending = b""
+            return data.replace(b"\r\n", b"\n").replace(b"\r\0", b"\r")
+        
+        out = bytearray()
+        i = 0
+        length = len(data)
+        while i < length:
+            byte = data[i]
+            if byte != _IAC:
+                out.append(byte)
+                i += 1
+                continue
+            # Незаконченная команда дождётся следующей порции
+            if i + 1 >= length:
+                break
+            command = data[i + 1]
+            if command == _IAC:
+                out.append(_IAC)
+                i += 2
+            elif command in (_DO, _DONT, _WILL, _WONT):
+                if i + 2 >= length:
+                    break
+                self._negotiate(command, data[i + 2])
+                i += 3
+            elif command == _SB:
+                end = data.find(bytes((_IAC, _SE)), i + 2)
+                if end < 0:
+                    break
+                i = end + 2
+            else:
+                i += 2
+        self._pending = data[i:]
+        return bytes(out).replace(b"\r\n", b"\n").replace(b"\r\0", b"\r")
+    
+    def _negotiate(self, command: int, option: int):
+        """Согласиться на эхо и SGA от сервера, от остального отказаться."""
+        if command == _WILL:
+            reply = _DO if option in _ACCEPTED else _DONT
+        elif command == _DO:
+            reply = _WONT
+        else:
+            return
+        self._writer.write(bytes((_IAC, reply, option)))
+    
+    async def expect(self, patterns, timeout: float) -> bytes:
+        """Читать, пока не встретится один из шаблонов; вернуть прочитанное."""
+        buffer = b""
+        deadline = time.monotonic() + timeout
+        while not any(pattern in buffer for pattern in patterns):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"Не дождались {patterns!r}")
+            chunk = await asyncio.wait_for(self.read(), remaining)
+            if not chunk:
+                raise EOFError("Соединение telnet закрыто")
+            buffer += chunk
+        return buffer
+    
+    def close(self):
+        """Закрыть соединение."""
+        self._writer.close()
+
+
+class TelnetTransport(BaseTransport):
+    """Telnet: без шифрования и рукопожатия SSH, команды идут в постоянную оболочку."""
+    
+    # Telnet и так даёт одну оболочку на соединение, поэтому command_mode не учитывается
+    
+    def __init__(self, *args, **kwargs):
+        """Инициализация."""
+        super().__init__(*args, **kwargs)
+        self._channel = None
+        self._framing = None
+        self._lock = asyncio.Lock()
+        self._shell_lock = asyncio.Lock()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Живо ли соединение."""
+        return self._channel is not None and not self._channel.closed
+    
+    async def _async_open_channel(self) -> TelnetChannel:
+        """Подключиться, войти и подготовить оболочку."""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=SSH_TIMEOUT
+        )
+        channel = TelnetChannel(reader, writer)
+        try:
+            # Часть прошивок сразу пускает в оболочку без имени и пароля
+            seen = await channel.expect(
+                _LOGIN_PROMPTS + (_PASSWORD_PROMPT, b"# ", b"$ "), SSH_TIMEOUT
+            )
+            if any(prompt in seen for prompt in _LOGIN_PROMPTS):
+                channel.write(f"{self.username}\n".encode())
+                seen = await channel.expect((_PASSWORD_PROMPT, b"# ", b"$ "), SSH_TIMEOUT)
+            if _PASSWORD_PROMPT in seen:
+                channel.write(f"{self.password}\n".encode())
+            
+            # Всё до маркера готовности (эхо строки настройки, приветствие) отбрасываем
+            channel.write(_SHELL_SETUP)
+            seen = await channel.expect((_READY + b"\n",) + _LOGIN_FAILED, SSH_TIMEOUT)
+            if _READY not in seen:
+                raise PermissionError("Неверное имя пользователя или пароль")
+            
+            channel.write(b"echo '@@dlink-''echo'\n")
+            seen = await channel.expect((_ECHO_CHECK + b"\n",), SSH_TIMEOUT)
+            channel.echo = b"@@dlink-''echo" in seen
+        except BaseException:
+            channel.close()
+            raise
+        return channel
+    
+    async def async_connect(self) -> bool:
+        """Подключиться по telnet (или переиспользовать живое соединение)."""
+        async with self._lock:
+            if self.is_connected:
+                self.sessions_reused += 1
+                return True
+            
+            if not self._may_attempt():
+                return False
+            
+            self._close_channel()
+            try:
+                with self.timings.measure("handshake"):
+                    self._channel = await self._async_open_channel()
+                self._framing = ShellFraming()
+                self._connected()
+                return True
+            except Exception as err:
+                self._connect_failed(err)
+                return False
+    
+    def _close_channel(self):
+        """Закрыть соединение, не трогая паузу переподключения."""
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+            self._framing = None
+    
+    async def async_close(self):
+        """Отключиться."""
+        async with self._lock:
+            self._close_channel()
+    
+    async def _async_exchange(self, commands: List[str], timeout: float, raw: bool) -> List:
+        """Записать команды в оболочку и прочитать ответы по маркерам."""
+        async with self._shell_lock:
+            channel = self._channel
+            framing = self._framing
+            payload, tokens = framing.script(commands)
+            channel.write(payload)
+            deadline = time.monotonic() + timeout
+            
+            # Эхо всей записи приходит раньше вывода команд: вырезаем его
+            if channel.echo:
+                while payload not in framing.buffer:
+                    await self._async_read_into(channel, framing, deadline)
+                start = framing.buffer.find(payload)
+                del framing.buffer[start:start + len(payload)]
+            
+            results = []
+            for token in tokens:
+                output = framing.pop(token, raw)
+                while output is None:
+                    await self._async_read_into(channel, framing, deadline)
+                    output = framing.pop(token, raw)
+                results.append(output)
+            return results
+    
+    @staticmethod
+    async def _async_read_into(channel: TelnetChannel, framing: ShellFraming, deadline: float):
+        """Дочитать порцию вывода в буфер разбора до общего срока."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError("Нет ответа от оболочки")
+        chunk = await asyncio.wait_for(channel.read(), remaining)
+        if not chunk:
+            raise EOFError("Оболочка завершилась")
+        framing.feed(chunk)
+    
+    async def async_run_pipelined(
+        self, commands: List[str], timeout: float = SSH_TIMEOUT, raw: bool = False
+    ) -> List:
+        """Выполнить команды одной записью в оболочку."""
+        for attempt in range(2):
+            if not await self.async_connect():
+                raise ConnectionError("Не удалось подключиться")
+            
+            try:
+                return await self._async_exchange(commands, timeout, raw)
+            except asyncio.TimeoutError:
+                # Команда зависла: соединение закрываем, но команду не повторяем
+                _LOGGER.warning("Оболочка telnet на %s не ответила, переподключаемся", self.host)
+                await self.async_close()
+                raise
+            except (EOFError, OSError) as err:
+                await self.async_close()
+                if attempt == 0:
+                    _LOGGER.debug(
+                        "Соединение telnet с %s оборвалось (%s), открываем заново", self.host, err
+                    )
+                    continue
+                _LOGGER.error("Ошибка выполнения команд по telnet: %s", err)
+                raise
+    
+    async def async_run(self, command: str, timeout: float = SSH_TIMEOUT, raw: bool = False):
+        """Выполнить команду."""
+        return (await self.async_run_pipelined([command], timeout, raw))[0]
+    
+    async def async_open_stream(self, command: str) -> TelnetChannel:
+        """Запустить долгую команду в отдельном соединении telnet."""
+        channel = await self._async_open_channel()
+        line = f"{command}\n".encode()
+        channel.write(line)
+        if channel.echo:
+            # Эхо команды содержит маркеры секций — отдаём потоку только то, что после него
+            seen = await channel.expect((line,), SSH_TIMEOUT)
+            channel.unread(seen[seen.find(line) + len(line):])
+        return channel
\ No newline at end of file
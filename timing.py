@@ -0,0 +1,62 @@
+"""Timing instrumentation for D-Link Router."""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+from .const import TIMING_WINDOW
+
+
+class RollingStats:
+    """Скользящее окно замеров длительности с перцентилями."""
+    
+    def __init__(self, window: int = TIMING_WINDOW):
+        """Инициализация."""
+        self._values = deque(maxlen=window)
+    
+    def add(self, seconds: float):
+        """Добавить замер."""
+        self._values.append(seconds)
+    
+    def summary(self) -> Dict:
+        """Число замеров в окне, p50, p95 и максимум (миллисекунды)."""
+        if not self._values:
+            return {}
+        values = sorted(self._values)
+        count = len(values)
+        return {
+            "count": count,
+            "p50_ms": round(values[count // 2] * 1000, 1),
+            "p95_ms": round(values[min(count - 1, int(count * 0.95))] * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+
+
+class TimingRecorder:
+    """Замеры по стадиям опроса: handshake, command, parse, poll."""
+    
+    def __init__(self, window: int = TIMING_WINDOW):
+        """Инициализация."""
+        self._window = window
+        self.stages = {}
+    
+    def add(self, stage: str, seconds: float):
+        """Добавить замер стадии."""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = RollingStats(self._window)
+        stats.add(seconds)
+    
+    @contextmanager
+    def measure(self, stage: str):
+        """Замерить блок кода как стадию (в том числе при ошибке)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+    
+    def summary(self) -> Dict[str, Dict]:
+        """Статистика всех стадий."""
+        return {stage: stats.summary() for stage, stats in sorted(self.stages.items())}
\ No newline at end of file
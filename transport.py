@@ -0,0 +1,427 @@
+"""Transports for D-Link Router: base session, factory and capability probe.
+
+Бэкенды живут в своих модулях (ssh_paramiko, ssh_asyncssh, telnet, jsonrpc) и загружаются
+по требованию: paramiko и asyncssh тянут cryptography, импорт которой тормозит цикл событий.
+"""
+
+import asyncio
+import importlib
+import logging
+import random
+import sys
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from .const import (
+    SSH_TIMEOUT,
+    RECONNECT_BACKOFF_MIN,
+    RECONNECT_BACKOFF_MAX,
+    PROBE_TIMEOUT,
+    EXEC_MAX_CHANNELS,
+    SSH_BACKEND_PARAMIKO,
+    SSH_BACKEND_ASYNCSSH,
+    BACKEND_TELNET,
+    BACKEND_HTTP,
+    PROBE_BACKENDS,
+    CONF_SSH_PORT,
+    CONF_TELNET_PORT,
+    CONF_HTTP_PORT,
+    DEFAULT_PORT,
+    DEFAULT_TELNET_PORT,
+    DEFAULT_HTTP_PORT,
+    DEFAULT_HTTP_PATH,
+    COMMAND_MODE_EXEC,
+)
+from .timing import TimingRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+# Маркер конца ответа в интерактивной оболочке: @@dlink-end:<номер>:<код выхода>
+SHELL_END_MARKER = "@@dlink-end:"
+
+# stderr оболочки отбрасываем, чтобы он не забивал окно канала
+SHELL_INIT = b"exec 2>/dev/null\n"
+
+# Разделитель stdout и stderr команды в одной оболочке: @@dlink-stderr:<код выхода>
+STDERR_MARKER = "@@dlink-stderr:"
+
+# Модуль каждого бэкенда (импортируется при первом создании транспорта)
+BACKEND_MODULES = {
+    SSH_BACKEND_PARAMIKO: "ssh_paramiko",
+    SSH_BACKEND_ASYNCSSH: "ssh_asyncssh",
+    BACKEND_TELNET: "telnet",
+    BACKEND_HTTP: "jsonrpc",
+}
+
+
+class ShellFraming:
+    """Разбор ответов из одной оболочки по маркерам конца команды."""
+    
+    def __init__(self):
+        """Инициализация."""
+        self.seq = 0
+        self.buffer = bytearray()
+    
+    def script(self, commands: List[str]):
+        """Текст для записи в оболочку и маркеры, которых ждать по порядку."""
+        parts = []
+        tokens = []
+        for command in commands:
+            self.seq += 1
+            token = f"{SHELL_END_MARKER}{self.seq}:"
+            # echo перед маркером: вывод команды может не заканчиваться переводом строки;
+            # маркер разбит кавычками, чтобы эхо самой команды (telnet) с ним не совпало
+            parts.append(
+                f"{command}\n__rc=$?; echo; echo '{SHELL_END_MARKER}''{self.seq}:'$__rc\n"
+            )
+            tokens.append(token.encode())
+        return "".join(parts).encode(), tokens
+    
+    def feed(self, chunk: bytes):
+        """Добавить прочитанные байты."""
+        self.buffer += chunk
+    
+    def pop(self, token: bytes, raw: bool = False):
+        """Забрать ответ команды, если её маркер уже пришёл целиком."""
+        start = self.buffer.find(token)
+        if start < 0:
+            return None
+        end = self.buffer.find(b"\n", start)
+        if end < 0:
+            return None
+        output = bytes(self.buffer[:start])
+        del self.buffer[:end + 1]
+        if raw:
+            return output
+        return output.decode('utf-8', errors='ignore').strip()
+
+
+def wrap_stderr(command: str) -> str:
+    """Команда для оболочки без отдельного stderr: вывод, маркер с кодом выхода, stderr."""
+    # Подоболочка: exit, cd и переменные команды не трогают общую оболочку; stdin
+    # оболочки — остаток записанного скрипта, поэтому команде он не достаётся
+    return (
+        f"__e=/tmp/.dlink-stderr.$$; ( {command}\n) </dev/null 2>\"$__e\"; __r=$?; "
+        f"echo; echo '{STDERR_MARKER}'$__r; cat \"$__e\"; rm -f \"$__e\""
+    )
+
+
+def split_stderr(output: bytes) -> Tuple[Optional[int], bytes, bytes]:
+    """Код выхода, stdout и stderr из вывода команды wrap_stderr."""
+    stdout, marker, rest = output.rpartition(f"\n{STDERR_MARKER}".encode())
+    if not marker:
+        return None, output, b""
+    status, _, stderr = rest.partition(b"\n")
+    try:
+        return int(status), stdout, stderr
+    except ValueError:
+        return None, stdout, stderr
+
+
+class CommandResult:
+    """Итог одной команды execute_many."""
+    
+    __slots__ = ('index', 'command', 'exit_status', 'stdout', 'stderr', 'elapsed', 'error')
+    
+    def __init__(
+        self,
+        index: int,
+        command: str,
+        exit_status: Optional[int] = None,
+        stdout: str = "",
+        stderr: str = "",
+        elapsed: float = 0.0,
+        error: Optional[str] = None,
+    ):
+        """Инициализация (error — команда не выполнилась: таймаут или нет соединения)."""
+        self.index = index
+        self.command = command
+        self.exit_status = exit_status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+        self.error = error
+    
+    @property
+    def ok(self) -> bool:
+        """Команда выполнилась и вернула 0."""
+        return self.error is None and self.exit_status == 0
+    
+    def as_dict(self) -> Dict:
+        """Итог для ответа сервиса и события."""
+        return {
+            "command": self.command,
+            "exit_status": self.exit_status,
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+            "elapsed": round(self.elapsed, 3),
+            "error": self.error,
+        }
+
+
+class BaseTransport:
+    """Постоянная сессия с маршрутизатором: переподключение и пауза после ошибок."""
+    
+    # Можно ли запустить долгую команду (поток снимков)
+    supports_stream = True
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        command_mode: str = COMMAND_MODE_EXEC,
+    ):
+        """Инициализация."""
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.command_mode = command_mode
+        
+        self._backoff = 0
+        self._next_attempt = 0.0
+        
+        # Счётчики: сколько раз делали рукопожатие и сколько раз переиспользовали сессию
+        self.handshakes = 0
+        self.sessions_reused = 0
+        
+        # Длительность рукопожатий и команд
+        self.timings = TimingRecorder()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Жива ли текущая сессия."""
+        raise NotImplementedError
+    
+    def _may_attempt(self) -> bool:
+        """Можно ли сейчас подключаться (не идёт ли пауза после ошибки)."""
+        if time.monotonic() < self._next_attempt:
+            _LOGGER.debug(
+                "Пропуск подключения к %s: пауза ещё %.0f с",
+                self.host,
+                self._next_attempt - time.monotonic(),
+            )
+            return False
+        return True
+    
+    def _connected(self):
+        """Учесть успешное рукопожатие."""
+        self.handshakes += 1
+        self._backoff = 0
+        self._next_attempt = 0.0
+        _LOGGER.debug("SSH подключение установлено к %s", self.host)
+    
+    def _connect_failed(self, err: Exception):
+        """Экспоненциальная пауза с разбросом перед следующей попыткой."""
+        self._backoff = min(
+            max(self._backoff * 2, RECONNECT_BACKOFF_MIN), RECONNECT_BACKOFF_MAX
+        )
+        self._next_attempt = time.monotonic() + self._backoff * random.uniform(0.8, 1.2)
+        _LOGGER.error(
+            "Ошибка подключения к %s: %s (повтор через %s с)", self.host, err, self._backoff
+        )
+    
+    def reset_backoff(self):
+        """Разрешить немедленное подключение (например, из config flow)."""
+        self._backoff = 0
+        self._next_attempt = 0.0
+    
+    async def async_connect(self) -> bool:
+        """Подключиться (или переиспользовать живую сессию)."""
+        raise NotImplementedError
+    
+    async def async_close(self):
+        """Закрыть сессию."""
+        raise NotImplementedError
+    
+    async def async_run(self, command: str, timeout: float = SSH_TIMEOUT, raw: bool = False):
+        """Выполнить команду и вернуть stdout (raw — байты как есть, без декодирования)."""
+        raise NotImplementedError
+    
+    async def async_run_pipelined(
+        self, commands: List[str], timeout: float = SSH_TIMEOUT, raw: bool = False
+    ) -> List:
+        """Выполнить несколько команд; в режиме оболочки они пишутся разом."""
+        return [await self.async_run(command, timeout, raw) for command in commands]
+    
+    async def async_open_stream(self, command: str):
+        """Запустить долгую команду в отдельном канале; вернуть поток её вывода."""
+        raise NotImplementedError
+    
+    @property
+    def multiplexed(self) -> bool:
+        """Можно ли выполнять команды одновременно в отдельных каналах сессии."""
+        return False
+    
+    async def _async_exec(self, command: str, timeout: float) -> Tuple[Optional[int], bytes, bytes]:
+        """Выполнить команду; вернуть код выхода, stdout и stderr."""
+        # Одна оболочка на соединение: stderr приходит в том же выводе после маркера
+        return split_stderr(await self.async_run(wrap_stderr(command), timeout, raw=True))
+    
+    async def _async_exec_result(self, index: int, command: str, timeout: float) -> CommandResult:
+        """Выполнить команду и собрать её итог; ошибки не выбрасываются."""
+        start = time.monotonic()
+        try:
+            with self.timings.measure("exec"):
+                exit_status, stdout, stderr = await self._async_exec(command, timeout)
+        except (asyncio.TimeoutError, TimeoutError):
+            return CommandResult(
+                index, command, elapsed=time.monotonic() - start, error="timeout"
+            )
+        except Exception as err:
+            return CommandResult(
+                index, command, elapsed=time.monotonic() - start, error=str(err) or repr(err)
+            )
+        # Невалидный UTF-8 остаётся видимым (U+FFFD), а не пропадает молча
+        return CommandResult(
+            index,
+            command,
+            exit_status,
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace').strip(),
+            time.monotonic() - start,
+        )
+    
+    async def async_exec_many(
+        self, commands: Sequence[Tuple[str, float]]
+    ) -> AsyncIterator[CommandResult]:
+        """Выполнить команды (команда, таймаут) и отдавать итоги по мере завершения."""
+        if not self.multiplexed:
+            # Одна оболочка или HTTP-запрос за раз: команды идут по порядку
+            for index, (command, timeout) in enumerate(commands):
+                yield await self._async_exec_result(index, command, timeout)
+            return
+        
+        # Отдельный канал на команду в общей сессии; каналов не больше EXEC_MAX_CHANNELS
+        slots = asyncio.Semaphore(EXEC_MAX_CHANNELS)
+        
+        async def run(index: int, command: str, timeout: float) -> CommandResult:
+            async with slots:
+                return await self._async_exec_result(index, command, timeout)
+        
+        # Подключаемся заранее, иначе каждый канал начнёт своё рукопожатие
+        await self.async_connect()
+        tasks = [
+            asyncio.ensure_future(run(index, command, timeout))
+            for index, (command, timeout) in enumerate(commands)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Потребитель перестал читать итоги — оставшиеся команды не ждём
+            for task in tasks:
+                task.cancel()
+
+
+def backend_port(backend: str, config: dict) -> int:
+    """Порт маршрутизатора для транспорта из настроек записи."""
+    if backend == BACKEND_TELNET:
+        return config.get(CONF_TELNET_PORT, DEFAULT_TELNET_PORT)
+    if backend == BACKEND_HTTP:
+        return config.get(CONF_HTTP_PORT, DEFAULT_HTTP_PORT)
+    return config.get(CONF_SSH_PORT, DEFAULT_PORT)
+
+
+async def async_import_backend(backend: str) -> None:
+    """Импортировать модуль бэкенда в пуле потоков, не блокируя цикл событий."""
+    module = BACKEND_MODULES.get(backend)
+    if module is None or f"{__package__}.{module}" in sys.modules:
+        return
+    await asyncio.get_running_loop().run_in_executor(
+        None, importlib.import_module, f".{module}", __package__
+    )
+
+
+def create_transport(
+    backend: str,
+    host: str,
+    port: int,
+    username: str,
+    password: str,
+    command_mode: str = COMMAND_MODE_EXEC,
+    http_path: str = DEFAULT_HTTP_PATH,
+) -> BaseTransport:
+    """Создать транспорт выбранного бэкенда.
+    
+    Модуль бэкенда импортируется здесь; в цикле событий его стоит заранее
+    загрузить через async_import_backend.
+    """
+    if backend == SSH_BACKEND_ASYNCSSH:
+        from .ssh_asyncssh import AsyncSSHTransport
+        
+        return AsyncSSHTransport(host, port, username, password, command_mode)
+    if backend == SSH_BACKEND_PARAMIKO:
+        from .ssh_paramiko import ParamikoTransport
+        
+        return ParamikoTransport(host, port, username, password, command_mode)
+    if backend == BACKEND_TELNET:
+        from .telnet import TelnetTransport
+        
+        return TelnetTransport(host, port, username, password, command_mode)
+    if backend == BACKEND_HTTP:
+        from .jsonrpc import JsonRpcTransport
+        
+        return JsonRpcTransport(host, port, username, password, command_mode, path=http_path)
+    raise ValueError(f"Неизвестный бэкенд: {backend}")
+
+
+async def async_tcp_probe(
+    host: str, port: int, timeout: float = PROBE_TIMEOUT
+) -> Optional[float]:
+    """Время TCP-подключения к порту, секунды (None — порт не отвечает)."""
+    start = time.monotonic()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError) as err:
+        _LOGGER.debug("Порт %s:%s не отвечает: %s", host, port, err)
+        return None
+    elapsed = time.monotonic() - start
+    writer.close()
+    return elapsed
+
+
+async def async_probe_transports(
+    host: str, username: str, password: str, config: dict, http_path: str = DEFAULT_HTTP_PATH
+) -> Dict[str, Optional[float]]:
+    """Проверить SSH-бэкенды: секунды на вход и одну команду (None — недоступен)."""
+    
+    async def probe(backend: str) -> Optional[float]:
+        port = backend_port(backend, config)
+        start = time.monotonic()
+        # Закрытый порт отсеивается за доли секунды, без таймаута входа
+        if await async_tcp_probe(host, port) is None:
+            return None
+        transport = create_transport(
+            backend, host, port, username, password, http_path=http_path
+        )
+        try:
+            if not await transport.async_connect():
+                return None
+            if await transport.async_run("echo dlink-probe") != "dlink-probe":
+                return None
+            return time.monotonic() - start
+        except Exception as err:
+            _LOGGER.debug("Транспорт %s к %s недоступен: %s", backend, host, err)
+            return None
+        finally:
+            try:
+                await transport.async_close()
+            except Exception:
+                pass
+    
+    for backend in PROBE_BACKENDS:
+        await async_import_backend(backend)
+    # Недоступные транспорты ждут таймаута, поэтому проверяем все разом
+    seconds = await asyncio.gather(*(probe(backend) for backend in PROBE_BACKENDS))
+    results = dict(zip(PROBE_BACKENDS, seconds))
+    _LOGGER.debug("Проверка транспортов %s: %s", host, results)
+    return results
+
+
+def fastest_backend(results: Dict[str, Optional[float]]) -> Optional[str]:
+    """Самый быстрый доступный транспорт по результатам проверки."""
+    available = {backend: seconds for backend, seconds in results.items() if seconds is not None}
+    return min(available, key=available.get) if available else None
\ No newline at end of file